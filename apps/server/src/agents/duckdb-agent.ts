@@ -24,12 +24,12 @@ CREATE TABLE argo_measurements (
     profile_timestamp   TIMESTAMPTZ,
     latitude            DOUBLE,
     longitude           DOUBLE,
-    pressure            DOUBLE,          -- dbar (≈ depth in meters)
-    temperature         DOUBLE,
-    salinity            DOUBLE,
-    temperature_adj     DOUBLE,          -- Delayed-mode adjusted (preferred)
-    salinity_adj        DOUBLE,
-    pressure_adj        DOUBLE,
+    pressure            FLOAT,           -- dbar (≈ depth in meters)
+    temperature         FLOAT,
+    salinity            FLOAT,
+    temperature_adj     FLOAT,           -- Delayed-mode adjusted (preferred)
+    salinity_adj        FLOAT,
+    pressure_adj        FLOAT,
     position_qc         VARCHAR,         -- '1' = good
     pres_qc             VARCHAR,
     temp_qc             VARCHAR,
@@ -37,11 +37,11 @@ CREATE TABLE argo_measurements (
     temp_adj_qc         VARCHAR,
     psal_adj_qc         VARCHAR,
     data_mode           VARCHAR,         -- 'R'=real-time, 'D'=delayed, 'A'=adjusted
-    oxygen              DOUBLE,          -- Can be NULL
+    oxygen              FLOAT,           -- Can be NULL
     oxygen_qc           VARCHAR,
-    chlorophyll         DOUBLE,          -- Can be NULL
+    chlorophyll         FLOAT,           -- Can be NULL
     chlorophyll_qc      VARCHAR,
-    nitrate             DOUBLE,          -- Can be NULL
+    nitrate             FLOAT,           -- Can be NULL
     nitrate_qc          VARCHAR,
     year                BIGINT,
     month               BIGINT
@@ -1,9 +1,19 @@
-import json
+import atexit
+import io
+import struct
+import threading
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import fields
 from datetime import UTC, datetime
+from operator import attrgetter
 from typing import Any, Literal, Optional
 
-import psycopg2
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.extensions import connection
+from psycopg2.extras import Json, execute_batch
+from psycopg2.pool import ThreadedConnectionPool
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +22,183 @@ from ..utils import get_logger
 
 logger = get_logger(__name__)
 
+# Fixed upsert column lists derived from the models, one row per float
+METADATA_COLUMNS = (*(f.name for f in fields(FloatMetadata)), "updated_at")
+STATUS_COLUMNS = (
+    "float_id",
+    "location",
+    *(
+        f.name
+        for f in fields(FloatStatus)
+        if f.name not in ("float_id", "latitude", "longitude")
+    ),
+    "updated_at",
+)
+
+# Schema DEFAULTs (packages/db/src/schema) for columns the models may leave
+# NULL. COPY writes an explicit NULL, which would bypass them on insert.
+COLUMN_DEFAULTS = {"status": "'UNKNOWN'", "float_type": "'unknown'"}
+
+
+def _upsert_sql(table: str, columns: tuple[str, ...], source: str) -> str:
+    # COALESCE keeps existing values for NULL fields, matching the
+    # exclude_none behaviour of the original per-float upload.
+    update_set = ", ".join(
+        f"{col} = COALESCE(EXCLUDED.{col}, {table}.{col})"
+        for col in columns
+        if col != "float_id"
+    )
+    return f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        {source}
+        ON CONFLICT (float_id) DO UPDATE SET {update_set}
+    """
+
+
+# Float upserts can be rebuilt by re-running the sync, so their transactions
+# don't wait for the WAL flush; processing_log writes keep the durable default
+ASYNC_COMMIT_SQL = "SET LOCAL synchronous_commit = off"
+
+PROCESSING_LOG_SQL = """
+    INSERT INTO processing_log (operation, status, successful_float_ids, failed_float_ids, processing_time_ms, error_details)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+def _stage_sql(table: str, columns: tuple[str, ...]) -> tuple[str, str, str]:
+    """Statements to create the staging table, COPY into it and merge it.
+
+    The staging table is a TEMP table, so every pooled connection gets its
+    own, and ON COMMIT DELETE ROWS empties it after each batch.
+    """
+    stage = f"{table}_stage"
+    cols = ", ".join(columns)
+    # A NULL in a defaulted column keeps the stored value for existing floats
+    # (like every other column) and takes the DEFAULT for new ones
+    select = ", ".join(
+        f"COALESCE(s.{col}, t.{col}, {COLUMN_DEFAULTS[col]})"
+        if col in COLUMN_DEFAULTS
+        else f"s.{col}"
+        for col in columns
+    )
+    return (
+        (
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ),
+        f"COPY {stage} ({cols}) FROM STDIN",
+        _upsert_sql(
+            table,
+            columns,
+            f"SELECT {select} FROM {stage} s LEFT JOIN {table} t USING (float_id)",
+        ),
+    )
+
+
+# Bulk upload: rows are streamed in with COPY and merged with a single
+# INSERT ... SELECT ... ON CONFLICT per table
+METADATA_STAGE_SQL = _stage_sql("argo_float_metadata", METADATA_COLUMNS)
+STATUS_STAGE_SQL = _stage_sql("argo_float_status", STATUS_COLUMNS)
+
+# Little-endian EWKB point: byte order, wkbPoint | SRID flag, SRID, x, y
+_EWKB_POINT = struct.Struct("<BIIdd")
+_EWKB_POINT_SRID = 0x20000001
+
+
+def _ewkb_point(lon: float, lat: float) -> str:
+    """Hex EWKB for an SRID 4326 point.
+
+    PostGIS reads hex EWKB straight into a geometry, skipping the WKT parse
+    that ST_GeomFromEWKT does for every row.
+    """
+    return _EWKB_POINT.pack(1, _EWKB_POINT_SRID, 4326, lon, lat).hex()
+
+
+# Pull a model's column values as a tuple in one call, in column order
+_metadata_values = attrgetter(*METADATA_COLUMNS[:-1])
+_status_values = attrgetter(*STATUS_COLUMNS[2:-1])
+
+
+def _metadata_row(metadata: FloatMetadata, now: datetime) -> tuple[Any, ...]:
+    return (*_metadata_values(metadata), now)
+
+
+def _status_row(status: FloatStatus, now: datetime) -> tuple[Any, ...]:
+    return (
+        status.float_id,
+        _ewkb_point(status.longitude, status.latitude),
+        *_status_values(status),
+        now,
+    )
+
+
+# COPY text format: tab-separated columns, \N for NULL, backslash escapes
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(rows: list[tuple[Any, ...]]) -> io.StringIO:
+    """Render rows as a COPY ... FROM STDIN text-format buffer."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(
+            "\t".join(
+                "\\N"
+                if value is None
+                else (
+                    value.isoformat() if isinstance(value, datetime) else str(value)
+                ).translate(_COPY_ESCAPES)
+                for value in row
+            )
+        )
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+# Connection pools shared by every PgClient in the process, keyed by
+# (dsn, max_connections). They outlive individual clients, so warm Lambda
+# invocations and repeated syncs skip the connect/TLS handshake.
+_pools: dict[tuple[str, int], ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _shared_pool(
+    dsn: str,
+    max_connections: int,
+    connect_timeout: int,
+    stale: ThreadedConnectionPool | None = None,
+) -> ThreadedConnectionPool:
+    """Return the process-wide pool for dsn, creating it on first use.
+
+    Passing the current pool as `stale` replaces it with a fresh one.
+    """
+    key = (dsn, max_connections)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool is stale or pool.closed:
+            if pool is not None and not pool.closed:
+                pool.closeall()
+            # One connection per concurrent worker - psycopg2 cursors must never
+            # be shared across threads, so every caller borrows its own connection.
+            # minconn == maxconn: putconn closes anything above minconn, so a
+            # lower floor would drop (and later re-dial) the extra connections.
+            pool = _pools[key] = ThreadedConnectionPool(
+                max_connections,
+                max_connections,
+                dsn,
+                connect_timeout=connect_timeout,
+            )
+        return pool
+
+
+@atexit.register
+def _close_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            if not pool.closed:
+                pool.closeall()
+        _pools.clear()
+
 
 class DatabaseSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -26,118 +213,117 @@ class DatabaseSettings(BaseSettings):
 
 
 class PgClient:
-    def __init__(self, db_url: Optional[str] = None):
+    def __init__(self, db_url: Optional[str] = None, max_connections: int = 1):
         self.settings = DatabaseSettings()
         self.db_url = db_url or self.settings.PG_WRITE_URL
 
         if not self.db_url:
             raise ValueError("DATABASE URL NOT PROVIDED!!")
 
-        self.conn = psycopg2.connect(
-            self.db_url,
-            connect_timeout=self.settings.DB_TIMEOUT,
+        self.max_connections = max_connections
+        self.pool = _shared_pool(
+            self.db_url, self.max_connections, self.settings.DB_TIMEOUT
         )
 
-        # Disable autocommit for transaction batching
-        self.conn.autocommit = False
-
-        self.cur = self.conn.cursor()
-
-    def batch_upload_data(
-        self,
-        metadata: FloatMetadata,
-        status: FloatStatus,
-        float_id: int,  # only used for logging
-    ) -> bool:
-        """Batch upload metadata and status in a SINGLE transaction.
-        Atomic all-or-nothing guarantee.
-        Benchmark: 1000 floats: 22.5 min -> 8.0 min (saves 14.5 minutes)
+        # processing_log rows waiting for the next flush_logs()
+        self._pending_logs: list[tuple[Any, ...]] = []
 
-        Uses a CTE (Common Table Expression) to execute both inserts
-        in a single SQL statement, reducing network round-trips.
+    def ensure_connected(self) -> None:
+        """Check the pool with `SELECT 1` and reconnect if the server went away.
 
-        NOTE: Caller must still commit the transaction.
+        Meant for long-lived clients (e.g. reused across warm Lambda
+        invocations), whose idle connections may have been dropped between runs.
+        Only one pooled connection is probed; on failure the whole pool is
+        replaced, since the others idled just as long.
         """
         try:
-            start_time = time.perf_counter()
-
-            # Prepare metadata
-            metadata_data = metadata.model_dump(exclude_none=True)
-            metadata_data["updated_at"] = datetime.now(UTC)
-
-            # Prepare status with PostGIS geometry
-            status_data = status.model_dump(exclude_none=True)
-            point_wkt = f"SRID=4326;POINT({status.longitude} {status.latitude})"
-            status_data.pop("latitude", None)
-            status_data.pop("longitude", None)
-            status_data["location"] = point_wkt
-            status_data["updated_at"] = datetime.now(UTC)
-
-            # Build metadata columns/values
-            meta_cols = list(metadata_data.keys())
-            meta_vals = [metadata_data[col] for col in meta_cols]
-            meta_update_set = ", ".join(
-                [f"{col} = EXCLUDED.{col}" for col in meta_cols if col != "float_id"]
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                conn.rollback()
+        except (OperationalError, InterfaceError) as e:
+            logger.warning("Pg connection lost, reconnecting", error=str(e))
+            self.pool = _shared_pool(
+                self.db_url,
+                self.max_connections,
+                self.settings.DB_TIMEOUT,
+                stale=self.pool,
             )
 
-            # Build status columns/values
-            status_cols = list(status_data.keys())
-            status_vals = []
-            status_placeholders = []
+    @contextmanager
+    def connection(self) -> Iterator[connection]:
+        """Borrow a connection from the pool and return it when done."""
+        pool = self.pool
+        conn = pool.getconn()
+        try:
+            # Disable autocommit for transaction batching
+            conn.autocommit = False
+            yield conn
+        finally:
+            pool.putconn(conn)
 
-            for col in status_cols:
-                if col == "location":
-                    status_placeholders.append("ST_GeomFromEWKT(%s)")
-                else:
-                    status_placeholders.append("%s")
-                status_vals.append(status_data[col])
+    def close(self) -> None:
+        """Flush queued log entries.
 
-            status_update_set = ", ".join(
-                [f"{col} = EXCLUDED.{col}" for col in status_cols if col != "float_id"]
-            )
+        The pooled connections stay open for the next PgClient in this
+        process; they are closed at interpreter exit.
+        """
+        self.flush_logs()
 
-            # Build a SINGLE SQL statement using CTEs
-            # This executes as one query, one network roundtrip
-            query = f"""
-                WITH meta_insert AS (
-                    INSERT INTO argo_float_metadata ({", ".join(meta_cols)})
-                    VALUES ({", ".join(["%s"] * len(meta_cols))})
-                    ON CONFLICT (float_id) DO UPDATE SET {meta_update_set}
-                    RETURNING float_id
-                )
-                INSERT INTO argo_float_status ({", ".join(status_cols)})
-                VALUES ({", ".join(status_placeholders)})
-                ON CONFLICT (float_id) DO UPDATE SET {status_update_set}
-                RETURNING float_id
-            """
-
-            # Combine all parameter values
-            all_values = tuple(meta_vals + status_vals)
-
-            # Execute single statement with all inserts
-            self.cur.execute(query, all_values)
-
-            query_time = time.perf_counter() - start_time
-
-            logger.debug(
-                "Batched upload executed (single query)",
-                extra={
-                    "float_id": float_id,
-                    "statements": 2,
-                    "query_time_ms": round(query_time * 1000, 2),
-                },
-            )
+    def bulk_upload(self, rows: list[tuple[FloatMetadata, FloatStatus]]) -> bool:
+        """Upsert many floats' metadata and status in a SINGLE transaction.
 
+        Each table's rows are streamed into a TEMP staging table with COPY,
+        then merged with one `INSERT ... SELECT ... ON CONFLICT`, so the server
+        parses and plans two statements per table for the whole batch.
+
+        Args:
+            rows: List of (metadata, status) pairs; status must have a location
+
+        Returns:
+            True if every row was written, False if the batch was rolled back
+        """
+        if not rows:
             return True
 
+        # ON CONFLICT can't touch the same row twice in one statement
+        by_float = {metadata.float_id: (metadata, status) for metadata, status in rows}
+        now = datetime.now(UTC)
+
+        meta_rows = [_metadata_row(metadata, now) for metadata, _ in by_float.values()]
+        status_rows = [_status_row(status, now) for _, status in by_float.values()]
+
+        # The pool raises PoolError instead of waiting when every connection is
+        # out, so borrowing counts as part of the upload and fails it cleanly
+        start_time = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(ASYNC_COMMIT_SQL)
+                        # Metadata first: status rows reference it
+                        for (create_sql, copy_sql, merge_sql), table_rows in (
+                            (METADATA_STAGE_SQL, meta_rows),
+                            (STATUS_STAGE_SQL, status_rows),
+                        ):
+                            cur.execute(create_sql)
+                            cur.copy_expert(copy_sql, _copy_text(table_rows))
+                            cur.execute(merge_sql)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
         except Exception as e:
-            logger.error(
-                "Batch upload failed",
-                extra={"float_id": float_id, "error": str(e)},
-            )
-            self.conn.rollback()
+            logger.error("Bulk upload failed", floats=len(by_float), error=str(e))
             return False
 
+        logger.debug(
+            "Bulk upload committed",
+            floats=len(by_float),
+            query_time_ms=round((time.perf_counter() - start_time) * 1000, 2),
+        )
+        return True
+
     def log_processing(
         self,
         operation: Literal["SYNC", "SYNC_ALL", "WEEKLY_UPDATE"],
@@ -147,7 +333,10 @@ class PgClient:
         processing_time_ms: Optional[int] = None,
         error_details: Optional[dict[str, Any]] = None,
     ) -> bool:
-        """Log a processing event to the processing_log table.
+        """Queue a processing event for the processing_log table.
+
+        Entries are written by `flush_logs()` at the commit boundary (`close()`
+        flushes any that are still pending).
 
         Args:
             operation: Type of operation (SYNC, SYNC_ALL, WEEKLY_UPDATE)
@@ -158,38 +347,57 @@ class PgClient:
             error_details: Optional error details as JSON
 
         Returns:
-            True if logging succeeded, False otherwise
+            True once the entry is queued
         """
-        try:
-            query = """
-                INSERT INTO processing_log (operation, status, successful_float_ids, failed_float_ids, processing_time_ms, error_details)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            self.cur.execute(
-                query,
-                (
-                    operation,
-                    status,
-                    successful_float_ids or [],
-                    failed_float_ids or [],
-                    processing_time_ms,
-                    json.dumps(error_details) if error_details else None,
-                ),
-            )
-            logger.info(
-                "Processing log entry created",
-                extra={
-                    "operation": operation,
-                    "status": status,
-                    "successful_count": len(successful_float_ids or []),
-                    "failed_count": len(failed_float_ids or []),
-                },
+        self._pending_logs.append(
+            (
+                operation,
+                status,
+                successful_float_ids or [],
+                failed_float_ids or [],
+                processing_time_ms,
+                Json(error_details) if error_details else None,
             )
+        )
+        logger.info(
+            "Processing log entry queued",
+            extra={
+                "operation": operation,
+                "status": status,
+                "successful_count": len(successful_float_ids or []),
+                "failed_count": len(failed_float_ids or []),
+            },
+        )
+        return True
+
+    def flush_logs(self) -> bool:
+        """Write all queued processing_log entries in a single transaction.
+
+        Uses execute_batch so the entries go out as a few multi-statement
+        round-trips instead of one per entry.
+
+        Returns:
+            True if the entries were written (or nothing was queued), False otherwise
+        """
+        if not self._pending_logs:
             return True
 
+        entries, self._pending_logs = self._pending_logs, []
+        try:
+            with self.connection() as conn:
+                try:
+                    with conn.cursor() as cur:
+                        execute_batch(cur, PROCESSING_LOG_SQL, entries, page_size=100)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
         except Exception as e:
             logger.error(
-                "Failed to log processing event",
-                extra={"operation": operation, "error": str(e)},
+                "Failed to log processing events",
+                extra={"entries": len(entries), "error": str(e)},
             )
             return False
+
+        logger.info("Processing log entries created", extra={"entries": len(entries)})
+        return True
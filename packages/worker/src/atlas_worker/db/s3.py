@@ -1,15 +1,57 @@
+import asyncio
+from functools import cache
 from pathlib import Path
 from typing import Optional
 
 import boto3
+import httpx
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.client import BaseClient
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from s3transfer.futures import TransferFuture
 
+from ..config import settings as app_settings
 from ..utils import get_logger
 
 logger = get_logger(__name__)
 
+MB = 1024 * 1024
+
+# Presigned PUT uploads: URL lifetime, attempts per file (retrying 5xx such as
+# 503 SlowDown with exponential backoff) and how many PUTs run at once
+PRESIGNED_URL_EXPIRY = 3600
+PRESIGNED_PUT_ATTEMPTS = 3
+PRESIGNED_PUT_BACKOFF = 0.5
+MAX_CONCURRENT_PUTS = 32
+
+
+@cache
+def _get_s3(
+    endpoint_url: str, access_key: str, secret_key: str, region: str
+) -> BaseClient:
+    """Build the boto3 client once per process and credential set.
+
+    boto3 clients are thread-safe, so every S3Client (and warm Lambda
+    invocation) shares one instead of repeating session setup, endpoint
+    resolution and signer construction. Adaptive retries back off on
+    503 SlowDown.
+    """
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+        config=Config(
+            tcp_keepalive=True,
+            max_pool_connections=64,
+            retries={"mode": "adaptive", "max_attempts": 5},
+        ),
+    )
+
 
 class S3Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -36,12 +78,28 @@ class S3Client:
         if not self.settings.S3_ENDPOINT:
             raise ValueError("S3_ENDPOINT not configured")
 
-        self.client = boto3.client(
-            "s3",
-            endpoint_url=self.settings.S3_ENDPOINT,
-            aws_access_key_id=self.settings.S3_ACCESS_KEY,
-            aws_secret_access_key=self.settings.S3_SECRET_KEY,
-            region_name=self.settings.S3_REGION,
+        self.client = _get_s3(
+            self.settings.S3_ENDPOINT,
+            self.settings.S3_ACCESS_KEY,
+            self.settings.S3_SECRET_KEY,
+            self.settings.S3_REGION,
+        )
+
+        # Files under the threshold go up as a single PUT; larger ones are split
+        # into 16 MB parts uploaded in parallel.
+        self._transfer_config = TransferConfig(
+            multipart_threshold=8 * MB,
+            multipart_chunksize=16 * MB,
+            max_concurrency=32,
+            use_threads=True,
+            io_chunksize=1 * MB,
+        )
+
+        # One transfer manager (and worker pool) for every upload from this
+        # client: when one file's last part lags, idle workers move straight
+        # on to the next file's parts instead of waiting for it.
+        self._transfer_manager = create_transfer_manager(
+            self.client, self._transfer_config
         )
 
         self.bucket_name = self.settings.S3_BUCKET_NAME
@@ -58,24 +116,139 @@ class S3Client:
         Returns:
             True if successful, False otherwise
         """
+        return self._wait(float_id, self._submit(float_id, local_path))
+
+    def upload_many(self, items: list[tuple[str, Path]]) -> dict[str, bool]:
+        """Upload many Parquet files through the shared transfer manager.
+
+        Every file is queued up front, so parts from different files share
+        the same worker pool instead of each file waiting on the previous one.
+
+        Args:
+            items: List of (float_id, local_path) pairs
+
+        Returns:
+            Dict mapping float_id to upload success
+        """
+        futures = {fid: self._submit(fid, path) for fid, path in items}
+        return {fid: self._wait(fid, future) for fid, future in futures.items()}
+
+    async def upload_many_presigned(
+        self, items: list[tuple[str, Path]]
+    ) -> dict[str, bool]:
+        """Upload many Parquet files as plain HTTP PUTs to presigned URLs.
+
+        URLs are presigned locally in one pass, then the bodies go out
+        concurrently over one async HTTP client, so boto3's per-request
+        signing and thread hand-off stay off the hot path. A presigned PUT
+        can't be multipart, so files above the multipart threshold still go
+        through the transfer manager.
+
+        Args:
+            items: List of (float_id, local_path) pairs
+
+        Returns:
+            Dict mapping float_id to upload success
+        """
+        small: list[tuple[str, Path]] = []
+        large: list[tuple[str, Path]] = []
+        results: dict[str, bool] = {}
+        for fid, path in items:
+            if not path.exists():
+                logger.warning("Local file not found", float_id=fid, path=str(path))
+                results[fid] = False
+            elif path.stat().st_size > self._transfer_config.multipart_threshold:
+                large.append((fid, path))
+            else:
+                small.append((fid, path))
+
+        large_task = asyncio.create_task(asyncio.to_thread(self.upload_many, large))
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PUTS)
+        async with httpx.AsyncClient(timeout=app_settings.HTTP_TIMEOUT) as http:
+            uploaded = await asyncio.gather(
+                *[
+                    self._put_presigned(http, semaphore, fid, path)
+                    for fid, path in small
+                ]
+            )
+        results.update(zip((fid for fid, _ in small), uploaded))
+        results.update(await large_task)
+        return results
+
+    async def _put_presigned(
+        self,
+        http: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        float_id: str,
+        local_path: Path,
+    ) -> bool:
+        s3_key = self._object_key(float_id)
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket_name, "Key": s3_key},
+            ExpiresIn=PRESIGNED_URL_EXPIRY,
+        )
+
+        async with semaphore:
+            body = await asyncio.to_thread(local_path.read_bytes)
+            error = ""
+            for attempt in range(PRESIGNED_PUT_ATTEMPTS):
+                try:
+                    resp = await http.put(url, content=body)
+                    if resp.status_code < 500:
+                        resp.raise_for_status()
+                        logger.debug(
+                            "file uploaded to bucket",
+                            float_id=float_id,
+                            s3_key=s3_key,
+                            file_size_mb=round(len(body) / MB, 2),
+                        )
+                        return True
+                    error = f"HTTP {resp.status_code}"
+                except httpx.HTTPStatusError as e:
+                    logger.error("R2 error", float_id=float_id, error=str(e))
+                    return False
+                except httpx.TransportError as e:
+                    error = str(e)
+
+                if attempt + 1 < PRESIGNED_PUT_ATTEMPTS:
+                    await asyncio.sleep(PRESIGNED_PUT_BACKOFF * 2**attempt)
+
+        logger.error("R2 error", float_id=float_id, error=error)
+        return False
+
+    def _object_key(self, float_id: str) -> str:
+        # Use Hive-style partitioning: profiles/float_id/data.parquet
+        return f"profiles/{float_id}/data.parquet"  # TODO: will chnage it later - atlas/{DAC-name}/{float-id}/data.parquet
+
+    def _submit(self, float_id: str, local_path: Path) -> TransferFuture | None:
         if not local_path.exists():
             logger.warning(
                 "Local file not found", float_id=float_id, path=str(local_path)
             )
-            return False
+            return None
 
-        # Use Hive-style partitioning: profiles/float_id/data.parquet
-        s3_key = f"profiles/{float_id}/data.parquet"  # TODO: will chnage it later - atlas/{DAC-name}/{float-id}/data.parquet
+        try:
+            return self._transfer_manager.upload(
+                str(local_path), self.bucket_name, self._object_key(float_id)
+            )
+        except Exception as e:
+            logger.error("Unexpected R2 error", exc_info=e)
+            return None
+
+    def _wait(self, float_id: str, future: TransferFuture | None) -> bool:
+        if future is None:
+            return False
 
         try:
-            file_size = local_path.stat().st_size
-            self.client.upload_file(str(local_path), self.bucket_name, s3_key)
+            future.result()
 
             logger.debug(
                 "file uploaded to bucket",
                 float_id=float_id,
-                s3_key=s3_key,
-                file_size_mb=round(file_size / (1024 * 1024), 2),
+                s3_key=future.meta.call_args.key,
+                file_size_mb=round((future.meta.size or 0) / MB, 2),
             )
 
             return True
@@ -1,18 +1,81 @@
 import asyncio
 import json
+import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any, Dict
 from .config import settings
-from .main import sync
+from .db import PgClient, S3Client
+from .main import MAX_DB_CONNECTIONS, sync
+from .workers import NetCDFParserWorker
+from .workers.argo_sync.sync import MANIFEST_FILENAME, MANIFEST_LOG_FILENAME
 
+# Staged floats touched within this window survive cleanup, so a warm retry
+# can reuse them instead of downloading again.
+STAGE_MAX_AGE_SECONDS = 60 * 60
 
-def cleanup_tmp():
-    """Remove all staging directories
+MANIFEST_FILES = frozenset({MANIFEST_FILENAME, MANIFEST_LOG_FILENAME})
 
-    AWS Lambda execution environments are reused across multiple invocations for performance reasons, so the tmp directory does not automatically reset after each run."""
+# Clients live at module scope so warm invocations reuse the Pg pool, the boto3
+# client and their open connections instead of reconnecting every run.
+_PG_CLIENT: PgClient | None = None
+_S3_CLIENT: S3Client | None = None
+_PARSER: NetCDFParserWorker | None = None
+
+
+def _last_modified(entry: os.DirEntry) -> float:
+    # Files are overwritten in place, which doesn't bump the directory's mtime
+    mtime = entry.stat(follow_symlinks=False).st_mtime
+    if entry.is_dir(follow_symlinks=False):
+        with os.scandir(entry.path) as children:
+            for child in children:
+                mtime = max(mtime, child.stat(follow_symlinks=False).st_mtime)
+    return mtime
+
+
+def _remove_entry(entry: os.DirEntry) -> None:
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path, ignore_errors=True)
+    else:
+        Path(entry.path).unlink(missing_ok=True)
+
+
+def cleanup_tmp(max_age: float = STAGE_MAX_AGE_SECONDS):
+    """Remove stale entries from the staging directories
+
+    AWS Lambda execution environments are reused across multiple invocations for performance reasons, so the tmp directory does not automatically reset after each run.
+    Only float directories and files older than `max_age` seconds are removed; the sync manifest and its log are always dropped so every run builds its own float list."""
+    cutoff = time.time() - max_age
+    stale: list[os.DirEntry] = []
     for path in [settings.LOCAL_STAGE_PATH, settings.PARQUET_STAGING_PATH]:
-        if path.exists():
-            shutil.rmtree(path)
+        if not path.exists():
+            continue
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name in MANIFEST_FILES or _last_modified(entry) < cutoff:
+                    stale.append(entry)
+
+    if stale:
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(_remove_entry, stale))
+
+
+def get_clients() -> tuple[PgClient, S3Client, NetCDFParserWorker]:
+    """Return the cached clients, creating them on a cold start."""
+    global _PG_CLIENT, _S3_CLIENT, _PARSER
+
+    if _PG_CLIENT is None:
+        _PG_CLIENT = PgClient(max_connections=MAX_DB_CONNECTIONS)
+    else:
+        # The environment may have been frozen long enough for Pg to drop us
+        _PG_CLIENT.ensure_connected()
+    if _S3_CLIENT is None:
+        _S3_CLIENT = S3Client()
+    if _PARSER is None:
+        _PARSER = NetCDFParserWorker()
+    return _PG_CLIENT, _S3_CLIENT, _PARSER
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -37,6 +100,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     try:
         operation = event.get("operation", "update")
+        db, s3_client, parser = get_clients()
 
         if operation == "sync":
             # Single float sync (for testing)
@@ -44,11 +108,15 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if not float_id:
                 raise ValueError("float_id required for sync operation")
 
-            result = asyncio.run(sync(float_id=float_id))
+            result = asyncio.run(
+                sync(float_id=float_id, db=db, s3_client=s3_client, parser=parser)
+            )
 
         elif operation == "update":
             # Weekly update (downloads only NEW floats)
-            result = asyncio.run(sync(update=True))
+            result = asyncio.run(
+                sync(update=True, db=db, s3_client=s3_client, parser=parser)
+            )
 
         else:
             raise ValueError(f"Invalid operation: {operation}. Use 'sync' or 'update'")
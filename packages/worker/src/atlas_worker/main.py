@@ -2,16 +2,27 @@ import argparse
 import asyncio
 import sys
 import time
+from collections.abc import Callable
+from concurrent.futures import Executor
+from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, TypedDict
 
 from .db import PgClient, S3Client
-from .models import FloatStatus
+from .models import FloatMetadata, FloatStatus
 from .utils import get_logger
 from .workers import ArgoSyncWorker, NetCDFParserWorker
 
 logger = get_logger(__name__)
 
+# Concurrency limit for per-float parsing
+MAX_CONCURRENT_FLOATS = 8
+
+# Floats per multi-row Pg upsert, and how many upserts may run at once (Pg pool size)
+BULK_UPLOAD_SIZE = 128
+MAX_DB_CONNECTIONS = 4
+
 
 class ProcessResult(TypedDict, total=False):
     success: bool
@@ -25,11 +36,114 @@ class ProcessResult(TypedDict, total=False):
     error: str
 
 
+class ParsedFloat(TypedDict):
+    parse_time: float
+    metadata: FloatMetadata
+    status: FloatStatus | None  # None when skipped for missing location
+    parquet_path: str | None
+
+
+# (float_id, metadata, status, parquet_path) waiting for a bulk Pg upsert
+PendingFloat = tuple[str, FloatMetadata, FloatStatus, str | None]
+
+
+async def _process_one(
+    fid: str,
+    semaphore: asyncio.Semaphore,
+    executor: Executor,
+    parse: Callable[[str], dict[str, Any]],
+) -> ParsedFloat:
+    """Parse a single float's NetCDF files into metadata, status and Parquet.
+
+    The NetCDF parser is blocking, so it runs on the parse executor (see
+    `NetCDFParserWorker.parse_executor`) while the semaphore caps how many
+    floats are in flight. Pg and R2 uploads are batched by the caller.
+
+    Raises:
+        ValueError: If parsing fails
+    """
+    async with semaphore:
+        # Parse NetCDF files
+        parse_start = time.time()
+        result = await asyncio.get_running_loop().run_in_executor(executor, parse, fid)
+        parse_time = time.time() - parse_start
+
+        if "error" in result:
+            raise ValueError(f"NetCDF parsing failed: {result['error']}")
+
+        if result.get("metadata") is None or result.get("status") is None:
+            raise ValueError("NetCDF parsing returned no metadata or status")
+
+        status_model: FloatStatus | None = FloatStatus.from_mapping(result["status"])
+
+        # Skip floats without location data (fixing a bug)
+        if status_model.latitude is None or status_model.longitude is None:
+            logger.warning(
+                "Skipping float insertion - no location data",
+                float_id=fid,
+                latitude=status_model.latitude,
+                longitude=status_model.longitude,
+            )
+            status_model = None
+
+        return {
+            "parse_time": parse_time,
+            "metadata": result["metadata"],
+            "status": status_model,
+            "parquet_path": result.get("parquet_path"),
+        }
+
+
+async def _upload_batch(
+    batch: list[PendingFloat],
+    semaphore: asyncio.Semaphore,
+    db: PgClient,
+) -> tuple[list[PendingFloat], bool, float]:
+    """Upsert one batch of parsed floats to Pg on its own pooled connection.
+
+    Returns:
+        Tuple of (batch, upload_success, upload_time)
+    """
+    async with semaphore:
+        upload_start = time.time()
+        upload_success = await asyncio.to_thread(
+            db.bulk_upload,
+            [(metadata, status) for _, metadata, status, _ in batch],
+        )
+        return batch, upload_success, time.time() - upload_start
+
+
+async def _upload_parquet(
+    batch: list[PendingFloat],
+    s3_client: S3Client,
+) -> tuple[dict[str, bool], float]:
+    """Upload one batch's Parquet files to R2, alongside its Pg upsert.
+
+    Returns:
+        Tuple of (per-float upload success, upload_time)
+    """
+    items: list[tuple[str, Path]] = []
+    for fid, _, _, parquet_path in batch:
+        if parquet_path:
+            items.append((fid, Path(parquet_path)))
+        else:
+            logger.debug("No parquet file to upload", float_id=fid)
+    if not items:
+        return {}, 0.0
+
+    upload_start = time.time()
+    results = await s3_client.upload_many_presigned(items)
+    return results, time.time() - upload_start
+
+
 async def sync(
     float_id: str | None = None,
     sync_all: bool = False,
     update: bool = False,
     skip_download: bool = False,
+    db: PgClient | None = None,
+    s3_client: S3Client | None = None,
+    parser: NetCDFParserWorker | None = None,
 ) -> ProcessResult:
     """Sync and process ARGO float(s): download, parse, upload to DB.
 
@@ -37,6 +151,8 @@ async def sync(
         float_id: Single float ID to sync (mutually exclusive with sync_all)
         sync_all: If True, sync all floats from DAC
         skip_download: Skip download phase, use cached files only
+        db, s3_client, parser: Long-lived clients to reuse (e.g. across warm
+            Lambda invocations). Any not given are created for this run.
 
     Returns:
         ProcessResult with success status and timing info
@@ -78,10 +194,10 @@ async def sync(
             total_floats = sync_result["total"]
         else:
             manifest = sync_worker._load_manifest()
-            total_floats = len(manifest.get("downloaded", []))
+            total_floats = len(manifest["downloaded"])
 
         manifest = sync_worker._load_manifest()
-        float_ids_to_process = manifest.get("downloaded", [])
+        float_ids_to_process = sorted(manifest["downloaded"])
 
     elif update:
         logger.info("Starting weekly update sync...")
@@ -100,7 +216,7 @@ async def sync(
         manifest = (
             sync_worker._load_manifest()
         )  # NOTE: syncALL and upadte uses same manifest file track.
-        float_ids_to_process = manifest.get("downloaded", [])
+        float_ids_to_process = sorted(manifest["downloaded"])
 
     else:
         assert float_id is not None
@@ -134,9 +250,12 @@ async def sync(
 
     # 2. Process and upload phase - create clients once outside loop
     try:
-        db = PgClient()
-        s3_client = S3Client()
-        parser = NetCDFParserWorker()
+        if db is None:
+            db = PgClient(max_connections=MAX_DB_CONNECTIONS)
+        if s3_client is None:
+            s3_client = S3Client()
+        if parser is None:
+            parser = NetCDFParserWorker()
     except Exception as e:
         logger.error("Failed to initialize clients", error=str(e))
         return {
@@ -159,98 +278,102 @@ async def sync(
     failed_float_ids_list: list[int] = []
 
     try:
-        for fid in float_ids_to_process:
-            try:
-                # Parse NetCDF files
-                parse_start = time.time()
-                result = parser.process_directory(
-                    fid
-                )  # FIXME: currently we are itterating through each float. we will do this operation concurrently later.
-                parse_time_total += time.time() - parse_start
-
-                if "error" in result:
-                    raise ValueError(f"NetCDF parsing failed: {result['error']}")
-
-                if result.get("metadata") is None or result.get("status") is None:
-                    raise ValueError("NetCDF parsing returned no metadata or status")
-
-                # Upload metadata and status to Pg
-                upload_start = time.time()
-                status_model = FloatStatus.model_validate(result["status"])
-
-                # Skip floats without location data (fixing a bug)
-                if status_model.latitude is None or status_model.longitude is None:
-                    logger.warning(
-                        "Skipping float insertion - no location data",
-                        float_id=fid,
-                        latitude=status_model.latitude,
-                        longitude=status_model.longitude,
-                    )
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FLOATS)
+        db_semaphore = asyncio.Semaphore(MAX_DB_CONNECTIONS)
+        parse_executor, parse = parser.parse_executor(
+            len(float_ids_to_process), max_threads=MAX_CONCURRENT_FLOATS
+        )
+        # Every float in the batch is aged against the same reference time
+        parse = partial(parse, now=datetime.now(UTC))
+        parse_tasks = {
+            asyncio.create_task(
+                _process_one(fid, semaphore, parse_executor, parse)
+            ): fid
+            for fid in float_ids_to_process
+        }
+
+        # Flush each full batch to Pg and R2 as soon as it fills, while parsing
+        # continues. The two uploads are independent, so they run side by side.
+        errors: dict[str, str] = {}
+        pending: list[PendingFloat] = []
+        flush_tasks: list[asyncio.Task[tuple[list[PendingFloat], bool, float]]] = []
+        r2_tasks: list[asyncio.Task[tuple[dict[str, bool], float]]] = []
+        remaining = set(parse_tasks)
+        while remaining:
+            done, remaining = await asyncio.wait(
+                remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                fid = parse_tasks[task]
+                if (exc := task.exception()) is not None:
+                    errors[fid] = str(exc)
+                    continue
+
+                result = task.result()
+                parse_time_total += result["parse_time"]
+                status_model = result["status"]
+                if status_model is None:
                     # Still count as processed but skip DB insertion
                     processed_count += 1
                     continue
+                pending.append(
+                    (fid, result["metadata"], status_model, result["parquet_path"])
+                )
 
-                upload_success = db.batch_upload_data(
-                    metadata=result["metadata"],
-                    status=status_model,
-                    float_id=int(fid),
+            if len(pending) >= BULK_UPLOAD_SIZE or (pending and not remaining):
+                flush_tasks.append(
+                    asyncio.create_task(_upload_batch(pending, db_semaphore, db))
                 )
+                r2_tasks.append(
+                    asyncio.create_task(_upload_parquet(pending, s3_client))
+                )
+                pending = []
+        parse_executor.shutdown()
 
+        for batch, upload_success, upload_time in await asyncio.gather(*flush_tasks):
+            upload_time_total += upload_time
+            for fid, _, _, _ in batch:
                 if not upload_success:
-                    raise ValueError("Database upload failed")
-
-                # TODO: process the floats into both db in parallel
-
-                # Upload Parquet to R2
-                parquet_path = result.get("parquet_path")
-                if parquet_path:
-                    try:
-                        s3_client.upload_file(
-                            float_id=fid,
-                            local_path=Path(parquet_path),
-                        )
-                    except Exception as e:
-                        logger.warning("R2 upload skipped", float_id=fid, error=str(e))
-                else:
-                    logger.debug("No parquet file to upload", float_id=fid)
-
-                upload_time_total += time.time() - upload_start
+                    errors[fid] = "Database upload failed"
+                    continue
 
                 # Track success
                 successful_float_ids.append(int(fid))
                 processed_count += 1
 
-            except Exception as e:
-                logger.error("Failed to process float", float_id=fid, error=str(e))
-                # Track failure
-                if fid.isdigit():
-                    failed_float_ids_list.append(int(fid))
-                process_failed += 1
-
-                # For single float, return failure immediately (but continue for sync_all or update)
-                if not sync_all and not update:
-                    # Log the single failure
-                    total_time_ms = int((time.time() - start_time) * 1000)
-                    db.log_processing(
-                        operation=operation,
-                        status="FAILED",
-                        successful_float_ids=[],
-                        failed_float_ids=[int(fid)] if fid.isdigit() else [],
-                        processing_time_ms=total_time_ms,
-                        error_details={"error": str(e)},
-                    )
-                    db.conn.commit()
-                    return {
-                        "success": False,
-                        "float_id": float_id,
-                        "error": str(e),
-                        "download_failed": 0,
-                        "process_failed": 1,
-                    }
-
-            # Commit every 10 floats for safety (batch mode)
-            if (sync_all or update) and (processed_count + process_failed) % 10 == 0:
-                db.conn.commit()
+        # R2 failures don't fail the float - the Pg rows are the source of truth
+        for r2_results, upload_time in await asyncio.gather(*r2_tasks):
+            upload_time_total += upload_time
+            for fid, ok in r2_results.items():
+                if not ok:
+                    logger.warning("R2 upload skipped", float_id=fid)
+
+        for fid, error in errors.items():
+            logger.error("Failed to process float", float_id=fid, error=error)
+            # Track failure
+            if fid.isdigit():
+                failed_float_ids_list.append(int(fid))
+            process_failed += 1
+
+            # For single float, return failure immediately (but continue for sync_all or update)
+            if not sync_all and not update:
+                # Log the single failure
+                total_time_ms = int((time.time() - start_time) * 1000)
+                db.log_processing(
+                    operation=operation,
+                    status="FAILED",
+                    successful_float_ids=[],
+                    failed_float_ids=[int(fid)] if fid.isdigit() else [],
+                    processing_time_ms=total_time_ms,
+                    error_details={"error": error},
+                )
+                return {
+                    "success": False,
+                    "float_id": float_id,
+                    "error": error,
+                    "download_failed": 0,
+                    "process_failed": 1,
+                }
 
         timing["parse_time"] = parse_time_total
         timing["upload_time"] = upload_time_total
@@ -274,8 +397,6 @@ async def sync(
             else None,
         )
 
-        db.conn.commit()
-
         if sync_all or update:
             label = "Weekly update" if update else "Full float sync"
             logger.info(
@@ -316,7 +437,7 @@ async def sync(
             }
 
     finally:
-        db.conn.close()
+        db.close()
 
 
 # TODO: Add a @retry so we can process the failed floats again
@@ -1,108 +1,113 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+# Example rows, kept for docs and manual testing
+FLOAT_METADATA_EXAMPLE = {
+    "float_id": 2902224,
+    "wmo_number": "2902224",
+    "status": "ACTIVE",
+    "float_type": "core",
+    "data_centre": "IN",
+    "project_name": "Argo India",
+    "operating_institution": "INCOIS",
+    "pi_name": "M Ravichandran",
+    "platform_type": "ARVOR",
+    "platform_maker": "NKE",
+    "float_serial_no": "17007",
+    "launch_date": "2019-03-15T00:00:00Z",
+    "launch_lat": 16.42,
+    "launch_lon": 88.05,
+}
 
+FLOAT_STATUS_EXAMPLE = {
+    "float_id": 2902224,
+    "latitude": -4.8,
+    "longitude": 72.1,
+    "cycle_number": 320,
+    "battery_percent": 69,
+    "last_update": "2025-11-29T03:20:00Z",
+    "last_depth": 2000,
+    "last_temp": 15.2,
+    "last_salinity": 34.5,
+}
 
-class FloatMetadata(BaseModel):
-    """ARGO float metadata matching argo_float_metadata table schema."""
 
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "float_id": 2902224,
-                "wmo_number": "2902224",
-                "status": "ACTIVE",
-                "float_type": "core",
-                "data_centre": "IN",
-                "project_name": "Argo India",
-                "operating_institution": "INCOIS",
-                "pi_name": "M Ravichandran",
-                "platform_type": "ARVOR",
-                "platform_maker": "NKE",
-                "float_serial_no": "17007",
-                "launch_date": "2019-03-15T00:00:00Z",
-                "launch_lat": 16.42,
-                "launch_lon": 88.05,
-            }
-        }
-    )
+# Plain slotted dataclasses: built once per float from values the parser has
+# already converted, so they skip Pydantic validation on the hot path.
+@dataclass(slots=True, kw_only=True)
+class FloatMetadata:
+    """ARGO float metadata matching argo_float_metadata table schema."""
 
     # Core identifiers
-    float_id: int = Field(..., description="Float ID (integer)")
-    wmo_number: str = Field(..., description="WMO number (string)")
+    float_id: int  # Float ID (integer)
+    wmo_number: str  # WMO number (string)
 
     # Status and type
-    status: Optional[str] = Field(
-        "UNKNOWN",
-        description="ACTIVE | INACTIVE | UNKNOWN | DEAD",
-    )
-    float_type: Optional[str] = Field(
-        "unknown",
-        description="core | oxygen | biogeochemical | deep | unknown",
-    )
+    status: Optional[str] = "UNKNOWN"  # ACTIVE | INACTIVE | UNKNOWN | DEAD
+    # core | oxygen | biogeochemical | deep | unknown
+    float_type: Optional[str] = "unknown"
 
     # Institutional info
-    data_centre: str = Field(..., description="Data centre code (e.g., IN)")
-    project_name: Optional[str] = Field(None, description="Project name")
-    operating_institution: Optional[str] = Field(
-        None, description="Operating institution"
-    )
-    pi_name: Optional[str] = Field(None, description="Principal investigator")
+    data_centre: str  # Data centre code (e.g., IN)
+    project_name: Optional[str] = None
+    operating_institution: Optional[str] = None
+    pi_name: Optional[str] = None  # Principal investigator
 
     # Platform details
-    platform_type: Optional[str] = Field(
-        None, description="Platform type (ARVOR, APEX)"
-    )
-    platform_maker: Optional[str] = Field(None, description="Platform maker (NKE)")
-    float_serial_no: Optional[str] = Field(None, description="Float serial number")
+    platform_type: Optional[str] = None  # ARVOR, APEX
+    platform_maker: Optional[str] = None  # NKE
+    float_serial_no: Optional[str] = None
 
     # Deployment info
-    launch_date: Optional[datetime] = Field(None, description="Deployment date")
-    launch_lat: Optional[float] = Field(None, description="Deployment latitude")
-    launch_lon: Optional[float] = Field(None, description="Deployment longitude")
-    start_mission_date: Optional[datetime] = Field(None, description="Mission start")
-    end_mission_date: Optional[datetime] = Field(None, description="Mission end")
+    launch_date: Optional[datetime] = None
+    launch_lat: Optional[float] = None
+    launch_lon: Optional[float] = None
+    start_mission_date: Optional[datetime] = None
+    end_mission_date: Optional[datetime] = None
 
 
-class FloatStatus(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class FloatStatus:
     """ARGO float current position matching argo_float_status table schema."""
 
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "float_id": 2902224,
-                "latitude": -4.8,
-                "longitude": 72.1,
-                "cycle_number": 320,
-                "battery_percent": 69,
-                "last_update": "2025-11-29T03:20:00Z",
-                "last_depth": 2000,
-                "last_temp": 15.2,
-                "last_salinity": 34.5,
-            }
-        }
-    )
-
-    float_id: int = Field(..., description="Float ID (FK to argo_float_metadata)")
-    latitude: Optional[float] = Field(None, description="Current latitude")
-    longitude: Optional[float] = Field(None, description="Current longitude")
-    cycle_number: Optional[int] = Field(None, description="Current cycle number")
-    battery_percent: Optional[int] = Field(
-        None, description="Battery percentage (0-100)"
-    )
-    last_update: Optional[datetime] = Field(
-        None, validation_alias="profile_time", description="Last profile timestamp"
-    )
-    last_depth: Optional[float] = Field(None, description="Last max depth in meters")
-    last_temp: Optional[float] = Field(None, description="Surface temperature (C)")
-    last_salinity: Optional[float] = Field(None, description="Surface salinity (PSU)")
+    float_id: int  # FK to argo_float_metadata
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    cycle_number: Optional[int] = None
+    battery_percent: Optional[int] = None  # 0-100
+    last_update: Optional[datetime] = None  # Last profile timestamp
+    last_depth: Optional[float] = None  # Last max depth in meters
+    last_temp: Optional[float] = None  # Surface temperature (C)
+    last_salinity: Optional[float] = None  # Surface salinity (PSU)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "FloatStatus":
+        """Build from a profile stats dict (see `get_profile_stats`).
+
+        `profile_time` is accepted as an alias for `last_update`, and the
+        float ID may be a string (it comes from the file name).
+        """
+        battery_percent = data.get("battery_percent")
+        return cls(
+            float_id=int(data["float_id"]),
+            latitude=data.get("latitude"),
+            longitude=data.get("longitude"),
+            cycle_number=data.get("cycle_number"),
+            battery_percent=None if battery_percent is None else int(battery_percent),
+            last_update=data.get("profile_time") or data.get("last_update"),
+            last_depth=data.get("last_depth"),
+            last_temp=data.get("last_temp"),
+            last_salinity=data.get("last_salinity"),
+        )
 
 
 # TODO_DUCKDB: Profile data models for DuckDB/Parquet storage
 # These will be used when implementing DuckDB upload operations
 #
-# class MeasurementProfile(BaseModel):
+# @dataclass(slots=True, kw_only=True)
+# class MeasurementProfile:
 #     """Single vertical profile measurement."""
 #     depth: float
 #     temperature: Optional[float]
@@ -110,7 +115,8 @@ class FloatStatus(BaseModel):
 #     oxygen: Optional[float]
 #     chlorophyll: Optional[float]
 #
-# class ProfileData(BaseModel):
+# @dataclass(slots=True, kw_only=True)
+# class ProfileData:
 #     """Complete ARGO float profile cycle for DuckDB storage."""
 #     float_id: int
 #     cycle_number: int
@@ -6,10 +6,81 @@ import numpy as np
 import xarray as xr
 
 from ..models.argo import FloatMetadata
+from .battery import alkaline_percent, deep_arvor_percent, lithium_percent
 from .logging import get_logger
 
 logger = get_logger(__name__)
 
+# Lowercased PARAMETER names that mark each BGC sensor family
+OXYGEN_PARAMS = frozenset({"doxy", "doxy2", "doxy3"})
+BACKSCATTER_PARAMS = frozenset({"bbp470", "bbp532", "bbp700", "beta_backscattering"})
+NITRATE_PARAMS = frozenset({"nitrate", "ntra", "ntrate"})
+
+DEEP_PLATFORM_FAMILIES = frozenset({"DEEP", "DEEP ARVOR", "DEEP NINJA", "DEEP APEX"})
+
+_EMPTY_STRINGS = np.array([], dtype=str)
+
+# Presence flags gathered by classify_float_type
+_OXYGEN = 1 << 0
+_OPTODE = 1 << 1
+_CHLA = 1 << 2
+_BACKSCATTER = 1 << 3
+_NITRATE = 1 << 4
+_PH = 1 << 5
+_CDOM = 1 << 6
+_MANY_PARAMS = 1 << 7  # more than 3 parameters
+_BIO_SENSOR = 1 << 8
+_DEEP = 1 << 9
+_FLAG_COUNT = 10
+
+
+def _float_type_for(flags: int) -> str:
+    """Classification rules over the presence flags."""
+    if flags & _DEEP:
+        return "deep"
+
+    # Oxygen-only floats
+    if flags & (_OXYGEN | _OPTODE):
+        # But if it also has other BGC sensors → upgrade to biogeochemical
+        if flags & (_CHLA | _BACKSCATTER | _NITRATE | _PH | _CDOM):
+            return "biogeochemical"
+        return "oxygen"
+
+    # Full BGC suite (multiple BGC variables)
+    if (flags & (_CHLA | _BACKSCATTER | _NITRATE | _PH)).bit_count() >= 2:
+        return "biogeochemical"
+
+    # Partial BGC (any BGC sensor)
+    if flags & (_CHLA | _BACKSCATTER | _NITRATE | _PH | _CDOM):
+        return "biogeochemical"
+
+    # Enhanced core (more than 3 params or bio sensors)
+    if flags & (_MANY_PARAMS | _BIO_SENSOR):
+        return "biogeochemical"
+
+    # Pure core Argo (TEMP, PSAL, PRES only)
+    return "core"
+
+
+# The rules only ever see these 10 bits, so evaluate them once for every
+# combination and classify by lookup
+_FLOAT_TYPE_BY_FLAGS = tuple(_float_type_for(f) for f in range(1 << _FLAG_COUNT))
+
+
+def _normalize_strings(values: np.ndarray) -> np.ndarray:
+    """Decode, strip and lowercase a char array in one pass, dropping blanks."""
+    flat = values.ravel()
+    if flat.dtype.kind == "O":
+        # Mixed object arrays still come back as bytes or str per element
+        is_bytes = flat.size > 0 and isinstance(flat[0], bytes)
+        flat = flat.astype("S" if is_bytes else "U")
+    if flat.dtype.kind == "S":
+        flat = np.char.decode(flat, "utf-8")
+    elif flat.dtype.kind != "U":
+        return _EMPTY_STRINGS
+    flat = np.char.lower(np.char.strip(flat))
+    return flat[flat != ""]
+
 
 class Helper:
     def classify_float_type(self, ds: xr.Dataset) -> str:
@@ -23,55 +94,43 @@ class Helper:
         """
         try:
             # Extract parameters and sensors
-            params = []
-            sensors = []
+            params = _EMPTY_STRINGS
+            sensors = _EMPTY_STRINGS
 
             if "PARAMETER" in ds.variables:
                 param_data = ds["PARAMETER"].values
                 if isinstance(param_data, np.ndarray):
-                    params = [
-                        p.decode().strip().lower()
-                        if isinstance(p, bytes)
-                        else str(p).lower()
-                        for p in param_data.flatten()
-                        if p
-                        and (
-                            isinstance(p, bytes)
-                            and p.strip()
-                            or isinstance(p, str)
-                            and p
-                        )
-                    ]
+                    params = _normalize_strings(param_data)
 
             if "SENSOR" in ds.variables:
                 sensor_data = ds["SENSOR"].values
                 if isinstance(sensor_data, np.ndarray):
-                    sensors = [
-                        s.decode().strip().lower()
-                        if isinstance(s, bytes)
-                        else str(s).lower()
-                        for s in sensor_data.flatten()
-                        if s
-                        and (
-                            isinstance(s, bytes)
-                            and s.strip()
-                            or isinstance(s, str)
-                            and s
-                        )
-                    ]
+                    sensors = _normalize_strings(sensor_data)
+
+            param_set = set(params.tolist())
+            # Substring checks run once over the NUL-joined names, not per name
+            sensor_text = "\x00".join(sensors.tolist())
 
             # Check for BGC parameters
-            has_oxygen = any(p in params for p in ["doxy", "doxy2", "doxy3"])
-            has_optode = any("opto" in s for s in sensors)
-
-            has_chla = "chla" in params or "chlorophyll" in " ".join(params)
-            has_backscatter = any(
-                x in params
-                for x in ["bbp470", "bbp532", "bbp700", "beta_backscattering"]
-            )
-            has_nitrate = any(x in params for x in ["nitrate", "ntra", "ntrate"])
-            has_ph = "ph_in_situ_total" in params
-            has_cdom = "cdom" in params
+            flags = 0
+            if not param_set.isdisjoint(OXYGEN_PARAMS):
+                flags |= _OXYGEN
+            if "opto" in sensor_text:
+                flags |= _OPTODE
+            if "chla" in param_set or "chlorophyll" in "\x00".join(param_set):
+                flags |= _CHLA
+            if not param_set.isdisjoint(BACKSCATTER_PARAMS):
+                flags |= _BACKSCATTER
+            if not param_set.isdisjoint(NITRATE_PARAMS):
+                flags |= _NITRATE
+            if "ph_in_situ_total" in param_set:
+                flags |= _PH
+            if "cdom" in param_set:
+                flags |= _CDOM
+            if params.size > 3:
+                flags |= _MANY_PARAMS
+            if "bio" in sensor_text:
+                flags |= _BIO_SENSOR
 
             # Deep Argo check
             platform_family = ""
@@ -83,63 +142,41 @@ class Helper:
                     pf_val = pf.flat[0]
                     if isinstance(pf_val, bytes):
                         platform_family = pf_val.decode().strip().upper()
+            if platform_family in DEEP_PLATFORM_FAMILIES:
+                flags |= _DEEP
 
-            if platform_family in ["DEEP", "DEEP ARVOR", "DEEP NINJA", "DEEP APEX"]:
-                return "deep"
-
-            # Oxygen-only floats
-            if has_oxygen or has_optode:
-                # But if it also has other BGC sensors → upgrade to biogeochemical
-                if any([has_chla, has_backscatter, has_nitrate, has_ph, has_cdom]):
-                    return "biogeochemical"
-                return "oxygen"
-
-            # Full BGC suite (multiple BGC variables)
-            if sum([has_chla, has_backscatter, has_nitrate, has_ph]) >= 2:
-                return "biogeochemical"
-
-            # Partial BGC (any BGC sensor)
-            if has_chla or has_backscatter or has_nitrate or has_ph or has_cdom:
-                return "biogeochemical"
-
-            # Enhanced core (more than 3 params or bio sensors)
-            if len(params) > 3 or any("bio" in s for s in sensors):
-                return "biogeochemical"
-
-            # Pure core Argo (TEMP, PSAL, PRES only)
-            return "core"
+            return _FLOAT_TYPE_BY_FLAGS[flags]
 
         except Exception as e:
             logger.warning("Failed to classify float type", error=str(e))
             return "unknown"
 
     def determine_float_status(
-        self, ds: xr.Dataset, recent_profile_time: Optional[datetime.datetime] = None
+        self,
+        end_mission_date: str | None,
+        recent_profile_time: datetime.datetime | None = None,
+        *,
+        now: datetime.datetime | None = None,
     ) -> str:
         """Determine float operational status.
 
         Args:
-            ds: xarray Dataset from metadata file
+            end_mission_date: Stripped END_MISSION_DATE string from the metadata file
             recent_profile_time: Most recent profile timestamp (if available)
+            now: Reference time; batch callers pass one value for the whole run
 
         Returns:
             Status: 'ACTIVE', 'INACTIVE', 'DEAD', or 'UNKNOWN'
         """
         try:
-            # Check if END_MISSION_DATE is set
-            if "END_MISSION_DATE" in ds.variables:
-                end_date_val = ds["END_MISSION_DATE"].values
-                if isinstance(end_date_val, np.ndarray):
-                    end_date_val = end_date_val.item()
-                if isinstance(end_date_val, bytes):
-                    end_date_str = end_date_val.decode("utf-8").strip()
-                    # If END_MISSION_DATE is set (not empty/spaces), float is inactive
-                    if end_date_str and not end_date_str.isspace():
-                        return "INACTIVE"
+            # If END_MISSION_DATE is set (not empty/spaces), float is inactive
+            if end_mission_date and not end_mission_date.isspace():
+                return "INACTIVE"
 
             # Check recent activity
             if recent_profile_time:
-                now = datetime.datetime.now(UTC)
+                if now is None:
+                    now = datetime.datetime.now(UTC)
                 days_since_last = (now - recent_profile_time).days
 
                 if days_since_last < 45:  # 45 days = official "active" threshold
@@ -176,7 +213,7 @@ class Helper:
             platform_type: Float model (APEX, ARVOR, PROVOR, etc.)
             cycle_number: Current cycle number
             current_voltage: Current battery voltage (from tech.nc)
-            metadata: FloatMetadata Pydantic model or dict (used for chemistry detection)
+            metadata: FloatMetadata (used for chemistry detection)
 
         Returns:
             Battery percentage (0-100) or None if cannot estimate"""
@@ -188,46 +225,19 @@ class Helper:
             if metadata:
                 launch_date = metadata.launch_date
                 # Check for pre-2010 APEX with potentially alkaline batteries
-                if launch_date and platform == "APEX":
-                    year_str = (
-                        launch_date.year
-                        if hasattr(launch_date, "year")
-                        else str(launch_date)[:4]
-                    )
-                    if year_str and int(year_str) <= 2010:
-                        chemistry = "alkaline"
-
-            # 2. Unified non-linear lithium curve (covers APEX, ARVOR, PROVOR, NAVIS, NINJA)
-            # Real fleet data shows <3% difference -> one curve is enough
-            def lithium_percent(v: float) -> int:
-                if v >= 14.0:
-                    return min(100, int(90 + (v - 14.0) * 12))
-                if v >= 13.0:
-                    return int(75 + (v - 13.0) * 15)
-                if v >= 12.0:
-                    return int(55 + (v - 12.0) * 20)
-                if v >= 11.6:
-                    return int(40 + (v - 11.6) * 50)  # 11.57V → ~40%
-                if v >= 11.0:
-                    return int(15 + (v - 11.0) * 50)
-                if v >= 10.8:
-                    return int(5 + (v - 10.8) * 50)
-                return 0
-
-            # Deep Arvor (28V system) — simple halving
-            def deep_arvor_percent(v: float) -> int:
-                return lithium_percent(v / 2)  # 28V → treat as 14V equivalent
-
-            # 3. Estimate from voltage
+                if launch_date and platform == "APEX" and launch_date.year <= 2010:
+                    chemistry = "alkaline"
+
+            # 2. Estimate from voltage (curves live in utils/battery.py)
             if current_voltage is not None:
                 if chemistry == "alkaline":
-                    return max(0, min(100, int(100 * (current_voltage - 10.5) / 5.0)))
+                    return alkaline_percent(current_voltage)
                 elif "DEEP ARVOR" in platform:
                     return deep_arvor_percent(current_voltage)
                 else:
                     return lithium_percent(current_voltage)
 
-            # 4. Fallback: cycle-based (very rough, but better than nothing)
+            # 3. Fallback: cycle-based (very rough, but better than nothing)
             typical = 280 if platform in ["APEX", "NAVIS", "SOLO-II"] else 220
             if cycle_number > 0:
                 return max(0, min(100, int(100 * (1 - cycle_number / typical))))
@@ -1,9 +1,16 @@
 import sys
+from functools import cache
 
 from loguru import logger
 
 from ..config import settings
 
+# Colored console format (dev/fallback) and the base format for prod JSON lines
+CONSOLE_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>"
+JSON_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {name}:{function}:{line} | {message}"
+)
+
 
 def setup_logging() -> None:
     """Configure loguru logging with colored console output for dev and JSON for production."""
@@ -15,35 +22,30 @@ def setup_logging() -> None:
     log_level = settings.LOG_LEVEL
 
     # Configure based on environment and log format
-    # Development always gets colored output for better readability
-    if settings.ENVIRONMENT == "dev":
-        # Development: Colored console output
-        logger.add(
-            sys.stdout,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
-            level=log_level,
-            colorize=True,
-            enqueue=True,
-        )
-    elif settings.ENVIRONMENT == "prod":
+    if settings.ENVIRONMENT == "prod":
         # Production: JSON structured logging for OpenTelemetry/Grafana/Loki
         logger.add(
             sys.stdout,
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {name}:{function}:{line} | {message}",
+            format=JSON_FORMAT,
             serialize=True,  # JSON output
             level=log_level,
             enqueue=False,  # Ref: https://github.com/Delgan/loguru/issues/418
+            # No frame inspection / extended tracebacks on error records
+            backtrace=False,
+            diagnose=False,
         )
     else:
-        # Fallback: Colored console output
+        # Development and fallback: Colored console output
         logger.add(
             sys.stdout,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+            format=CONSOLE_FORMAT,
             level=log_level,
             colorize=True,
-            enqueue=True,
+            enqueue=False,  # each parse worker process has its own sink anyway
         )
 
 
+# Bound loggers are immutable, so one per module name can be handed out repeatedly
+@cache
 def get_logger(name: str):
     return logger.bind(name=name)
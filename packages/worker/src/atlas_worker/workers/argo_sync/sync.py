@@ -1,7 +1,10 @@
 import asyncio
 import json
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Self, TypedDict
 
 import httpx
 
@@ -13,8 +16,112 @@ logger = get_logger(__name__)
 INDEX_GLOBAL_META = f"{settings.HTTP_BASE_URL}/ar_index_global_meta.txt"
 INDEX_THIS_WEEK_PROF = f"{settings.HTTP_BASE_URL}/ar_index_this_week_prof.txt"
 
-# Concurrency limit for downloads
+# Concurrency limit for downloads (hard ceiling for the adaptive limiter)
 MAX_CONCURRENT_DOWNLOADS = 10
+INITIAL_CONCURRENT_DOWNLOADS = 4
+
+# Responses that mean the GDAC wants us to slow down
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+# Concurrent throttled responses usually share a cause; cut at most once per window
+THROTTLE_COOLDOWN_SECONDS = 1.0
+
+# Each float pulls up to 4 files at once, all over the same pooled client
+HTTP_LIMITS = httpx.Limits(
+    max_connections=MAX_CONCURRENT_DOWNLOADS * 4, max_keepalive_connections=64
+)
+# Connect-level retries only (DNS/TCP/TLS failures), never a resent request
+HTTP_CONNECT_RETRIES = 2
+
+# prof/Rtraj files run to several MB; 1 MiB reads keep the loop count low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Interrupted transfers are retried, each attempt resuming via a Range request
+DOWNLOAD_ATTEMPTS = 3
+DOWNLOAD_BACKOFF = 0.5
+
+MANIFEST_FILENAME = "sync_manifest.json"
+# One JSON line per finished float, folded into the manifest on the next save
+MANIFEST_LOG_FILENAME = "sync_manifest.log"
+
+
+class Manifest(TypedDict):
+    downloaded: set[str]
+    failed: set[str]
+
+
+def _stamp_last_modified(file_path: Path, last_modified: str | None) -> None:
+    """Set the file's mtime to the server's Last-Modified, for If-Range later."""
+    if not last_modified:
+        return
+    try:
+        ts = parsedate_to_datetime(last_modified).timestamp()
+        os.utime(file_path, (ts, ts))
+    except (TypeError, ValueError, OSError):
+        pass
+
+
+def _write_all(fd: int, data: bytes) -> int:
+    """os.write until all of `data` is written; a single call may write less."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+    return len(data)
+
+
+def _expected_size(resp: httpx.Response) -> int | None:
+    """Size the file on disk should have once `resp` is fully written."""
+    if resp.status_code == 206:
+        total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+    elif "Content-Encoding" not in resp.headers:
+        # With an encoding, Content-Length counts the compressed bytes
+        total = resp.headers.get("Content-Length", "")
+    else:
+        return None
+    return int(total) if total.isdigit() else None
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency cap for float downloads.
+
+    Starts low and doubles after every `limit` clean downloads, up to
+    `ceiling`; halves when the server throttles us."""
+
+    def __init__(
+        self,
+        initial: int = INITIAL_CONCURRENT_DOWNLOADS,
+        ceiling: int = MAX_CONCURRENT_DOWNLOADS,
+    ):
+        self.limit = min(initial, ceiling)
+        self.ceiling = ceiling
+        self._in_flight = 0
+        self._successes = 0
+        self._last_cut = float("-inf")
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.ceiling:
+            self.limit = min(self.ceiling, self.limit * 2)
+            self._successes = 0
+            logger.debug("Download concurrency raised", limit=self.limit)
+
+    def on_throttle(self) -> None:
+        now = asyncio.get_running_loop().time()
+        if now - self._last_cut < THROTTLE_COOLDOWN_SECONDS:
+            return
+        self._last_cut = now
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+        logger.info("Download concurrency lowered", limit=self.limit)
 
 
 class ArgoSyncWorker:
@@ -24,50 +131,176 @@ class ArgoSyncWorker:
             Path(stage_path) if stage_path else Path(settings.LOCAL_STAGE_PATH)
         )
         self.stage_path.mkdir(parents=True, exist_ok=True)
-        self.manifest_path = self.stage_path / "sync_manifest.json"
+        self.manifest_path = self.stage_path / MANIFEST_FILENAME
+        self.manifest_log_path = self.stage_path / MANIFEST_LOG_FILENAME
+        self._client: httpx.AsyncClient | None = None
+        self._limiter: AdaptiveLimiter | None = None
+
+    async def __aenter__(self) -> Self:
+        """Open one HTTP/2 client shared by every download until exit."""
+        if self._client is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=True, limits=HTTP_LIMITS, retries=HTTP_CONNECT_RETRIES
+            )
+            self._client = httpx.AsyncClient(
+                transport=transport, timeout=settings.HTTP_TIMEOUT
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     # utility methods
-    def _load_manifest(self) -> dict:
-        """Load manifest tracking downloaded floats."""
-        if self.manifest_path.exists():
-            with open(self.manifest_path) as f:
-                return json.load(f)
-        return {"downloaded": [], "failed": []}
-
-    def _save_manifest(self, manifest: dict) -> None:
-        """Save manifest to disk."""
-        with open(self.manifest_path, "w") as f:
-            json.dump(manifest, f, indent=2)
-
-    async def _download_index(self, url: str) -> str:
-        """Download and return index file content."""
-        async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            return resp.text
+    def _load_manifest(self) -> Manifest:
+        """Load manifest tracking downloaded floats.
 
-    def _parse_index_for_floats(self, content: str) -> set[str]:
+        Replays the append-only log on top, so floats finished before a crash
+        are not downloaded again."""
+        manifest: Manifest = {"downloaded": set(), "failed": set()}
+        if self.manifest_path.exists():
+            raw = json.loads(self.manifest_path.read_bytes())
+            manifest["downloaded"].update(raw["downloaded"])
+            manifest["failed"].update(raw["failed"])
+        if self.manifest_log_path.exists():
+            with open(self.manifest_log_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash
+                    self._apply_result(manifest, entry["float_id"], entry["ok"])
+        return manifest
+
+    def _save_manifest(self, manifest: Manifest) -> None:
+        """Save manifest to disk and drop the log it now covers."""
+        # One-shot dumps without indent stays on the C encoder; json.dump and
+        # indent=2 both fall back to the pure-Python one
+        self.manifest_path.write_text(
+            json.dumps(
+                {
+                    "downloaded": sorted(manifest["downloaded"]),
+                    "failed": sorted(manifest["failed"]),
+                }
+            )
+        )
+        self.manifest_log_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _apply_result(manifest: Manifest, float_id: str, ok: bool) -> None:
+        if ok:
+            manifest["downloaded"].add(float_id)
+            # Drop it from the failed set if an earlier run couldn't get it
+            manifest["failed"].discard(float_id)
+        else:
+            manifest["failed"].add(float_id)
+
+    def _log_result(self, float_id: str, ok: bool) -> None:
+        """Append one float's outcome to the manifest log."""
+        with open(self.manifest_log_path, "a") as f:
+            f.write(json.dumps({"float_id": float_id, "ok": ok}) + "\n")
+
+    async def _download_index(self, url: str) -> bytes:
+        """Download and return raw index file content."""
+        assert self._client is not None
+        resp = await self._client.get(url)
+        resp.raise_for_status()
+        return resp.content
+
+    def _parse_index_for_floats(self, content: bytes) -> set[str]:
         """Parse index CSV and extract unique float IDs for our DAC.
 
         Index format: file,date,latitude,longitude,ocean,profiler_type,institution,date_update
         File path format: dac_name/float_id/... or dac_name/float_id/profiles/...
+
+        One multiline regex over the raw bytes picks the float id out of every
+        line starting with our DAC, without building per-line lists.
         """
-        float_ids: set[str] = set()
-        for line in content.splitlines():
-            if line.startswith("#") or not line.strip():
-                continue
-            parts = line.split(",")
-            if not parts:
-                continue
-            file_path = parts[0]
-            path_parts = file_path.split("/")
-            if len(path_parts) >= 2 and path_parts[0] == self.dac_name:
-                float_ids.add(path_parts[1])
-        return float_ids
+        pattern = re.compile(
+            rb"^" + re.escape(self.dac_name.encode()) + rb"/([^/,\r\n]+)", re.MULTILINE
+        )
+        return {fid.decode("ascii") for fid in set(pattern.findall(content))}
+
+    async def _fetch(
+        self, client: httpx.AsyncClient, url: str, file_path: Path
+    ) -> bool:
+        """Stream `url` into `file_path`, resuming a partial copy left on disk.
+
+        Files are stamped with the server's Last-Modified. Sending that back as
+        If-Range gets only the missing bytes (206) while the remote file is
+        unchanged, the whole file (200) if it changed since, and an empty 416
+        when the copy on disk is already complete.
+
+        Returns False when nothing needed fetching."""
+        headers: dict[str, str] = {}
+        offset = 0
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_size:
+            offset = st.st_size
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = formatdate(st.st_mtime, usegmt=True)
+
+        async with client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 416:
+                return False
+            resp.raise_for_status()
+            resume = resp.status_code == 206
+            if resume and not resp.headers.get("Content-Range", "").startswith(
+                f"bytes {offset}-"
+            ):
+                # Appending a range we didn't ask for would corrupt the file
+                file_path.unlink(missing_ok=True)
+                raise httpx.RemoteProtocolError(
+                    f"Unexpected Content-Range: {resp.headers.get('Content-Range')}"
+                )
+            flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if resume else os.O_TRUNC)
+            fd = os.open(file_path, flags, 0o644)
+            loop = asyncio.get_running_loop()
+            write: asyncio.Future | None = None
+            # Bytes this response has put on disk, counted once each write lands
+            size = offset if resume else 0
+            complete = False
+            try:
+                # Ref: https://www.python-httpx.org/async/
+                async for chunk in resp.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if write is not None:
+                        size += await write
+                    # Disk write runs off-loop while the next chunk arrives
+                    write = loop.run_in_executor(None, _write_all, fd, chunk)
+                if write is not None:
+                    size += await write
+                    write = None
+                expected = _expected_size(resp)
+                complete = expected is None or size == expected
+            finally:
+                # Never close the fd under an in-flight write
+                if write is not None:
+                    await asyncio.wait([write])
+                os.close(fd)
+                # Only a file that holds exactly the bytes received gets the
+                # server's date; an interrupted one is still a valid prefix
+                # to resume, a mismatched one must not pass If-Range later
+                if file_path.stat().st_size == size:
+                    _stamp_last_modified(file_path, resp.headers.get("Last-Modified"))
+            if not complete:
+                file_path.unlink(missing_ok=True)
+                raise httpx.RemoteProtocolError(
+                    f"Size mismatch: got {size} bytes, expected {expected}"
+                )
+        return True
 
     # sync a single float - Concurrently downloads 4 files for that one float using `gather`.
     async def sync(self, float_id: str) -> bool:
         """Sync the 4 core ARGO files for a specific float concurrently."""
+        if self._client is None:
+            # Called standalone, outside syncAll/update
+            async with self:
+                return await self.sync(float_id)
+
         logger.debug("Starting float download", float_id=float_id)
 
         files = [
@@ -84,30 +317,45 @@ class ArgoSyncWorker:
             """Download a single file, return True if successful."""
             url = f"{settings.HTTP_BASE_URL}/dac/{self.dac_name}/{float_id}/{filename}"
 
-            try:
-                async with client.stream("GET", url) as resp:
-                    resp.raise_for_status()
-                    file_path = float_dir / filename
-                    with open(file_path, "wb") as f:
-                        async for chunk in resp.aiter_bytes():
-                            f.write(chunk)  # Ref: https://www.python-httpx.org/async/
-                    logger.debug("Downloaded", file=filename)
+            for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                try:
+                    if await self._fetch(client, url, float_dir / filename):
+                        logger.debug("Downloaded", file=filename)
+                    else:
+                        logger.debug("Already complete on disk", file=filename)
                     return True
 
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    logger.debug("File not found (optional)", file=filename)
-                else:
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code == 404:
+                        logger.debug("File not found (optional)", file=filename)
+                    else:
+                        if (
+                            e.response.status_code in THROTTLE_STATUS_CODES
+                            and self._limiter is not None
+                        ):
+                            self._limiter.on_throttle()
+                        logger.error("Failed to download", file=filename, error=str(e))
+                    return False
+                except httpx.TransportError as e:
+                    if attempt == DOWNLOAD_ATTEMPTS:
+                        logger.error("Failed to download", file=filename, error=str(e))
+                        return False
+                    # The next attempt resumes from whatever reached the disk
+                    logger.debug(
+                        "Download interrupted, resuming",
+                        file=filename,
+                        attempt=attempt,
+                        error=str(e),
+                    )
+                    await asyncio.sleep(DOWNLOAD_BACKOFF * 2 ** (attempt - 1))
+                except Exception as e:
                     logger.error("Failed to download", file=filename, error=str(e))
-                return False
-            except Exception as e:
-                logger.error("Failed to download", file=filename, error=str(e))
-                return False
+                    return False
+            return False
 
-        async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
-            results = await asyncio.gather(
-                *[_download_file(client, f) for f in files]
-            )  # Ref: https://stackoverflow.com/a/61550673/28193141
+        results = await asyncio.gather(
+            *[_download_file(self._client, f) for f in files]
+        )  # Ref: https://stackoverflow.com/a/61550673/28193141
 
         success_count = sum(results)
         logger.debug(
@@ -115,11 +363,11 @@ class ArgoSyncWorker:
         )
         return success_count >= 1  # At least one file downloaded
 
-    # concurrently downalod multiple floats form DAC - each running their own `sync` (with semaphore to cap total concurrency).
+    # concurrently downalod multiple floats form DAC - each running their own `sync` (with an adaptive limiter to cap total concurrency).
     async def _sync_floats_concurrent(
         self, float_ids: set[str]
     ) -> tuple[list[str], list[str]]:
-        """Concurrently sync floats with semaphore limit.
+        """Concurrently sync floats under an adaptive concurrency limit.
 
         Args:
             float_ids: Set of float IDs to sync
@@ -130,23 +378,29 @@ class ArgoSyncWorker:
         if not float_ids:
             return [], []
 
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        limiter = self._limiter = AdaptiveLimiter()
         successful: list[str] = []
         failed: list[str] = []
 
         async def download_with_limit(float_id: str) -> tuple[str, bool]:
-            async with semaphore:
+            async with limiter:
                 try:
                     success = await self.sync(float_id)
-                    return float_id, success
                 except Exception as e:
                     logger.error("Float sync failed", float_id=float_id, error=str(e))
-                    return float_id, False
+                    success = False
+                if success:
+                    limiter.on_success()
+                self._log_result(float_id, success)
+                return float_id, success
 
         # Convert to list to maintain order for zip
         float_ids_list = list(float_ids)
         tasks = [download_with_limit(fid) for fid in float_ids_list]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._limiter = None
 
         for fid, result in zip(float_ids_list, results):
             if isinstance(result, BaseException):
@@ -169,6 +423,10 @@ class ArgoSyncWorker:
 
         Uses a manifest to track progress for resumable downloads.
         """
+        if self._client is None:
+            async with self:
+                return await self.syncAll()
+
         logger.info("Starting full DAC sync", dac=self.dac_name)
 
         # 1. Download and parse global meta index
@@ -179,7 +437,7 @@ class ArgoSyncWorker:
 
         # 2. Load manifest and determine what needs downloading
         manifest = self._load_manifest()
-        already_downloaded = set(manifest["downloaded"])
+        already_downloaded = manifest["downloaded"]
         pending_floats = all_floats - already_downloaded
 
         logger.info(
@@ -205,14 +463,10 @@ class ArgoSyncWorker:
 
         # 4. Update manifest
         for float_id in successful_floats:
-            manifest["downloaded"].append(float_id)
-            # Remove from failed list if it was previously marked as failed
-            if float_id in manifest["failed"]:
-                manifest["failed"].remove(float_id)
+            self._apply_result(manifest, float_id, True)
 
         for float_id in failed_floats:
-            if float_id not in manifest["failed"]:
-                manifest["failed"].append(float_id)
+            self._apply_result(manifest, float_id, False)
 
         # Save manifest
         self._save_manifest(
@@ -239,6 +493,10 @@ class ArgoSyncWorker:
 
         This is designed to run as a Lambda cron job.
         """
+        if self._client is None:
+            async with self:
+                return await self.update()
+
         logger.info("Starting weekly update", dac=self.dac_name)
 
         # 1. Download and parse weekly index
@@ -260,7 +518,7 @@ class ArgoSyncWorker:
 
         # 2. Load manifest and detrmine what needs to downlaod
         manifest = self._load_manifest()
-        already_downloaded = set(manifest["downloaded"])
+        already_downloaded = manifest["downloaded"]
         pending_floats = weekly_floats - already_downloaded
 
         logger.info(
@@ -286,14 +544,10 @@ class ArgoSyncWorker:
 
         # 4. Update manifest
         for float_id in successful_floats:
-            manifest["downloaded"].append(float_id)
-            # Remove from failed list if it was previously marked as failed
-            if float_id in manifest["failed"]:
-                manifest["failed"].remove(float_id)
+            self._apply_result(manifest, float_id, True)
 
         for float_id in failed_floats:
-            if float_id not in manifest["failed"]:
-                manifest["failed"].append(float_id)
+            self._apply_result(manifest, float_id, False)
 
         # Save manifest
         self._save_manifest(
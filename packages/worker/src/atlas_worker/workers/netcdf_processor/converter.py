@@ -1,15 +1,247 @@
-from datetime import datetime, timezone
 from pathlib import Path
 
 import numpy as np
 import pyarrow as pa
 import pyarrow.parquet as pq
 import xarray as xr
+from xarray.coding.times import decode_cf_datetime
 
 from ... import get_logger, settings
 
 logger = get_logger(__name__)
 
+# QC and mode flags are single characters: keep them as small dictionary codes
+# in memory and on disk (DuckDB still reads them back as VARCHAR)
+FLAG_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+# Output layout of {float_id}_profiles.parquet. Types are declared up front so
+# pyarrow never infers them, and they match the argo_measurements schema the
+# DuckDB agent queries (sparse BGC columns stay FLOAT/VARCHAR when all-null).
+# Measurements are float32 as in the Argo NetCDF files, so nothing is lost.
+# Columns typed FLAG_TYPE go through _flags_to_arrow.
+PROFILE_SCHEMA = pa.schema(
+    [
+        ("float_id", pa.int64()),
+        ("cycle_number", pa.float64()),
+        ("level", pa.int64()),
+        ("profile_timestamp", pa.timestamp("us", tz="UTC")),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("pressure", pa.float32()),
+        ("temperature", pa.float32()),
+        ("salinity", pa.float32()),
+        ("position_qc", FLAG_TYPE),
+        ("pres_qc", FLAG_TYPE),
+        ("temp_qc", FLAG_TYPE),
+        ("psal_qc", FLAG_TYPE),
+        ("temperature_adj", pa.float32()),
+        ("salinity_adj", pa.float32()),
+        ("pressure_adj", pa.float32()),
+        ("temp_adj_qc", FLAG_TYPE),
+        ("psal_adj_qc", FLAG_TYPE),
+        ("data_mode", FLAG_TYPE),
+        ("oxygen", pa.float32()),
+        ("oxygen_qc", FLAG_TYPE),
+        ("chlorophyll", pa.float32()),
+        ("chlorophyll_qc", FLAG_TYPE),
+        ("nitrate", pa.float32()),
+        ("nitrate_qc", FLAG_TYPE),
+        ("year", pa.int64()),
+        ("month", pa.int64()),
+    ]
+)
+
+# Columns written with Parquet dictionary encoding
+DICTIONARY_COLUMNS = ["float_id", "cycle_number"] + [
+    field.name for field in PROFILE_SCHEMA if pa.types.is_dictionary(field.type)
+]
+
+# String for each possible flag byte, matching a strip()ed utf-8 decode with
+# errors="ignore" (NUL padding and stray non-ASCII bytes come out empty)
+_FLAG_STRINGS = tuple(
+    bytes([code]).rstrip(b"\x00").decode("utf-8", errors="ignore").strip()
+    for code in range(256)
+)
+
+# Profiles converted and written per Parquet row group. Only one block of
+# columns is held in memory at a time, whatever the size of the float.
+PROFILES_PER_ROW_GROUP = 256
+
+
+def _flags_to_arrow(values: np.ndarray) -> pa.Array:
+    """Dictionary-encode a flat single-character flag column.
+
+    The dictionary indices are looked up straight from the byte codes, so no
+    per-row strings are built. Fills masked by xarray (NaN in an object
+    array) become nulls."""
+    missing = None
+    if values.dtype.kind == "O":
+        missing = np.not_equal(values, values)  # only NaN is unequal to itself
+        values = np.where(missing, b"", values).astype("S")
+    if values.dtype != np.dtype("S1"):
+        return (
+            _to_arrow(values, pa.string(), missing).dictionary_encode().cast(FLAG_TYPE)
+        )
+
+    codes = values.view(np.uint8)
+    present = np.flatnonzero(np.bincount(codes, minlength=256))
+    labels = [_FLAG_STRINGS[code] for code in present]
+    dictionary = list(dict.fromkeys(labels))
+    index_of = np.zeros(256, dtype=np.int8)
+    index_of[present] = [dictionary.index(label) for label in labels]
+    return pa.DictionaryArray.from_arrays(
+        pa.array(index_of[codes], mask=missing),
+        pa.array(dictionary, type=pa.string()),
+    )
+
+
+def _to_arrow(
+    values: np.ndarray, type_: pa.DataType, mask: np.ndarray | None = None
+) -> pa.Array:
+    """Convert a flat NetCDF column to an Arrow array of the given type.
+
+    NaN floats become nulls and char fields are decoded and stripped."""
+    if type_ == FLAG_TYPE:
+        return _flags_to_arrow(values)
+    kind = values.dtype.kind
+    if kind == "f":
+        return pa.array(values, type=type_, mask=np.isnan(values))
+    if kind in "iu":
+        return pa.array(values, type=type_)
+    if kind == "S":
+        values = np.char.decode(values, "utf-8", errors="ignore")
+        kind = "U"
+    if kind == "U":
+        return pa.array(np.char.strip(values), type=type_, mask=mask)
+    return pa.array(values.tolist(), type=type_, mask=mask)
+
+
+def _profile_block(
+    ds: xr.Dataset, block: slice, valid: np.ndarray, float_id: str
+) -> pa.Table:
+    """Denormalize one block of profiles into PROFILE_SCHEMA rows.
+
+    Args:
+        ds: Open prof.nc dataset
+        block: Slice of N_PROF to convert
+        valid: Levels with a pressure, shape (profiles in block, N_LEVELS)
+        float_id: Fallback id for blank PLATFORM_NUMBER entries
+    """
+    n_prof = ds.sizes["N_PROF"]
+    n_levels = ds.sizes["N_LEVELS"]
+
+    # Positions of the kept levels, found once; every column is then gathered
+    # with take() instead of re-scanning the boolean mask per variable.
+    # nonzero walks row-major, i.e. profile by profile, level by level.
+    prof_idx, level_idx = np.nonzero(valid)
+    flat_idx = prof_idx * n_levels + level_idx
+    n_rows = flat_idx.size
+
+    # Optional arrays; slicing before .values only reads this block from disk
+    def get_2d_array(var_name: str) -> np.ndarray | None:
+        arr = ds.get(var_name)
+        if arr is not None and arr.shape == (n_prof, n_levels):
+            return arr[block].values
+        return None
+
+    def get_1d_array(var_name: str) -> np.ndarray | None:
+        arr = ds.get(var_name)
+        if arr is not None and len(arr.shape) == 1 and arr.shape[0] == n_prof:
+            return arr[block].values
+        return None
+
+    def per_level(column: str, var_name: str) -> pa.Array:
+        type_ = PROFILE_SCHEMA.field(column).type
+        arr = get_2d_array(var_name)
+        if arr is None:
+            return pa.nulls(n_rows, type=type_)
+        return _to_arrow(arr.ravel().take(flat_idx), type_)
+
+    def per_profile(column: str, arr: np.ndarray | None) -> pa.Array:
+        type_ = PROFILE_SCHEMA.field(column).type
+        if arr is None:
+            return pa.nulls(n_rows, type=type_)
+        # Per-profile values are repeated once per kept level
+        return _to_arrow(arr.take(prof_idx), type_)
+
+    # PLATFORM_NUMBER is a padded char field; fall back to the directory's id
+    float_ids = ds["PLATFORM_NUMBER"][block].values
+    float_strs = np.char.strip(
+        np.char.decode(float_ids.astype("S"), "utf-8", errors="ignore")
+    )
+    float_ints = (
+        np.where(float_strs == "", float_id, float_strs)
+        .astype(np.float64)
+        .astype(np.int64)
+    )
+
+    # Profile timestamps, rounded to the microsecond like datetime would.
+    # JULD is opened undecoded, so only this block is converted (fills -> NaT).
+    juld = ds["JULD"]
+    juldays = juld[block].values
+    if "units" in juld.attrs:
+        juldays = decode_cf_datetime(
+            juldays, juld.attrs["units"], juld.attrs.get("calendar")
+        )
+    if juldays.dtype.kind == "M":
+        juld_ns = juldays.astype("datetime64[ns]")
+        no_time = np.isnat(juld_ns).take(prof_idx)
+        juld_us = (
+            (juld_ns + np.timedelta64(500, "ns"))
+            .astype("datetime64[us]")
+            .take(prof_idx)
+        )
+        profile_timestamps = pa.array(
+            juld_us, type=pa.timestamp("us", tz="UTC"), mask=no_time
+        )
+        years = pa.array(
+            juld_us.astype("datetime64[Y]").astype(np.int64) + 1970,
+            type=pa.int64(),
+            mask=no_time,
+        )
+        months = pa.array(
+            juld_us.astype("datetime64[M]").astype(np.int64) % 12 + 1,
+            type=pa.int64(),
+            mask=no_time,
+        )
+    else:
+        profile_timestamps = pa.nulls(n_rows, type=pa.timestamp("us", tz="UTC"))
+        years = months = pa.nulls(n_rows, type=pa.int64())
+
+    # BGC sensors (often sparse, 2D): OXYGEN, CHLOROPHYLL, NITRATE
+    columns = {
+        "float_id": pa.array(float_ints.take(prof_idx), type=pa.int64()),
+        "cycle_number": per_profile("cycle_number", ds["CYCLE_NUMBER"][block].values),
+        "level": pa.array(level_idx, type=pa.int64()),
+        "profile_timestamp": profile_timestamps,
+        "latitude": per_profile("latitude", ds["LATITUDE"][block].values),
+        "longitude": per_profile("longitude", ds["LONGITUDE"][block].values),
+        "pressure": per_level("pressure", "PRES"),
+        "temperature": per_level("temperature", "TEMP"),
+        "salinity": per_level("salinity", "PSAL"),
+        "position_qc": per_profile("position_qc", get_1d_array("POSITION_QC")),
+        "pres_qc": per_level("pres_qc", "PRES_QC"),
+        "temp_qc": per_level("temp_qc", "TEMP_QC"),
+        "psal_qc": per_level("psal_qc", "PSAL_QC"),
+        "temperature_adj": per_level("temperature_adj", "TEMP_ADJUSTED"),
+        "salinity_adj": per_level("salinity_adj", "PSAL_ADJUSTED"),
+        "pressure_adj": per_level("pressure_adj", "PRES_ADJUSTED"),
+        "temp_adj_qc": per_level("temp_adj_qc", "TEMP_ADJUSTED_QC"),
+        "psal_adj_qc": per_level("psal_adj_qc", "PSAL_ADJUSTED_QC"),
+        "data_mode": per_profile("data_mode", get_1d_array("DATA_MODE")),
+        "oxygen": per_level("oxygen", "OXYGEN"),
+        "oxygen_qc": per_level("oxygen_qc", "OXYGEN_QC"),
+        "chlorophyll": per_level("chlorophyll", "CHLOROPHYLL"),
+        "chlorophyll_qc": per_level("chlorophyll_qc", "CHLOROPHYLL_QC"),
+        "nitrate": per_level("nitrate", "NITRATE"),
+        "nitrate_qc": per_level("nitrate_qc", "NITRATE_QC"),
+        "year": years,
+        "month": months,
+    }
+    return pa.Table.from_arrays(
+        [columns[name] for name in PROFILE_SCHEMA.names], schema=PROFILE_SCHEMA
+    )
+
 
 class ParquetConverter:
     """Convert ARGO NetCDF profiles to Parquet (denormalized long format)."""
@@ -28,8 +260,18 @@ class ParquetConverter:
             logger.warning("Profile file not found", float_id=float_id)
             return None
 
+        output_path = self.staging_path / f"{float_id}_profiles.parquet"
         try:
-            with xr.open_dataset(prof_file) as ds:
+            # Blocks are read straight from the file and not kept (cache=False);
+            # JULD is decoded per block in _profile_block. Masking stays on so
+            # fill values arrive as NaN.
+            with xr.open_dataset(
+                prof_file,
+                engine="netcdf4",
+                decode_times=False,
+                decode_timedelta=False,
+                cache=False,
+            ) as ds:
                 n_prof = ds.sizes.get("N_PROF", 0)
                 n_levels = ds.sizes.get("N_LEVELS", 0)
 
@@ -37,193 +279,38 @@ class ParquetConverter:
                     logger.warning("Empty dataset", float_id=float_id)
                     return None
 
-                rows = []
-
-                # Extract required arrays
-                float_ids = ds["PLATFORM_NUMBER"].values
-                cycles = ds["CYCLE_NUMBER"].values
-                juldays = ds["JULD"].values
-                lats = ds["LATITUDE"].values
-                lons = ds["LONGITUDE"].values
-
-                # Optional 2D arrays - safely extract
-                def get_2d_array(var_name: str) -> np.ndarray | None:
-                    arr = ds.get(var_name)
-                    if arr is not None and arr.shape == (n_prof, n_levels):
-                        return arr.values
-                    return None
-
-                def get_1d_array(var_name: str) -> np.ndarray | None:
-                    arr = ds.get(var_name)
-                    if (
-                        arr is not None
-                        and len(arr.shape) == 1
-                        and arr.shape[0] == n_prof
-                    ):
-                        return arr.values
+                pres = ds.get("PRES")
+                if pres is None or pres.shape != (n_prof, n_levels):
+                    logger.warning("No valid measurements extracted", float_id=float_id)
                     return None
 
-                # 2D measurement arrays
-                pressures = get_2d_array("PRES")
-                pres_qc = get_2d_array("PRES_QC")
-                temps = get_2d_array("TEMP")
-                temp_qc = get_2d_array("TEMP_QC")
-                salts = get_2d_array("PSAL")
-                salt_qc = get_2d_array("PSAL_QC")
-
-                # Adjusted values (2D)
-                pres_adj = get_2d_array("PRES_ADJUSTED")
-                temp_adj = get_2d_array("TEMP_ADJUSTED")
-                salt_adj = get_2d_array("PSAL_ADJUSTED")
-                temp_adj_qc = get_2d_array("TEMP_ADJUSTED_QC")
-                salt_adj_qc = get_2d_array("PSAL_ADJUSTED_QC")
-
-                # 1D per-profile arrays
-                data_mode = get_1d_array("DATA_MODE")
-                pos_qc = get_1d_array("POSITION_QC")
-
-                # FIXME: I was planning to make o2 , n2 these double but im getting int with duckdb. need to investigate
-                # BGC sensors (often sparse, 2D)
-                oxygen = get_2d_array("OXYGEN")
-                oxygen_qc = get_2d_array("OXYGEN_QC")
-                chlorophyll = get_2d_array("CHLOROPHYLL")
-                chlorophyll_qc = get_2d_array("CHLOROPHYLL_QC")
-                nitrate = get_2d_array("NITRATE")
-                nitrate_qc = get_2d_array("NITRATE_QC")
-
-                # Helper to safely extract value
-                def get_value(arr: np.ndarray | None, i: int, j: int):
-                    if arr is None:
-                        return None
-                    try:
-                        val = arr[i, j]
-                        if isinstance(val, (bytes, np.bytes_)):
-                            return val.decode("utf-8", errors="ignore").strip()
-                        if isinstance(val, (np.floating, float)):
-                            return None if np.isnan(val) else float(val)
-                        if isinstance(val, (np.integer, int)):
-                            return int(val)
-                        return val
-                    except (IndexError, TypeError, ValueError):
-                        return None
-
-                def get_1d_value(arr: np.ndarray | None, i: int):
-                    if arr is None:
-                        return None
-                    try:
-                        val = arr[i]
-                        if isinstance(val, (bytes, np.bytes_)):
-                            return val.decode("utf-8", errors="ignore").strip()
-                        if isinstance(val, (np.floating, float)):
-                            return None if np.isnan(val) else float(val)
-                        if isinstance(val, (np.integer, int)):
-                            return int(val)
-                        return val
-                    except (IndexError, TypeError, ValueError):
-                        return None
-
-                # Iterate profiles (outer) -> levels (inner)
-                for prof_idx in range(n_prof):
-                    raw_float_id = float_ids[prof_idx]
-                    if isinstance(raw_float_id, bytes):
-                        float_str = raw_float_id.decode(
-                            "utf-8", errors="ignore"
-                        ).strip()
-                    else:
-                        float_str = str(raw_float_id).strip()
-                    float_int = int(float(float_str)) if float_str else int(float_id)
-
-                    cycle_num = get_1d_value(cycles, prof_idx)
-                    lat = get_1d_value(lats, prof_idx)
-                    lon = get_1d_value(lons, prof_idx)
-
-                    # Parse profile timestamp
-                    profile_timestamp = None
-                    try:
-                        juld_val = juldays[prof_idx]
-                        if not np.isnat(juld_val):
-                            ts = (
-                                juld_val - np.datetime64("1970-01-01T00:00:00")
-                            ) / np.timedelta64(1, "s")
-                            profile_timestamp = datetime.fromtimestamp(
-                                float(ts), tz=timezone.utc
-                            )
-                    except Exception:
-                        pass
-
-                    year = profile_timestamp.year if profile_timestamp else None
-                    month = profile_timestamp.month if profile_timestamp else None
-
-                    mode_char = get_1d_value(data_mode, prof_idx)
-                    pos_qc_char = get_1d_value(pos_qc, prof_idx)
-
-                    # Iterate depth levels (one row = one measurement at one depth)
-                    for level_idx in range(n_levels):
-                        pres_val = get_value(pressures, prof_idx, level_idx)
-
-                        # Skip rows without pressure (invalid levels)
-                        if pres_val is None:
-                            continue
-
-                        row = {
-                            "float_id": float_int,
-                            "cycle_number": cycle_num,
-                            "level": level_idx,
-                            "profile_timestamp": profile_timestamp,
-                            "latitude": lat,
-                            "longitude": lon,
-                            "pressure": pres_val,
-                            "temperature": get_value(temps, prof_idx, level_idx),
-                            "salinity": get_value(salts, prof_idx, level_idx),
-                            "position_qc": pos_qc_char,
-                            "pres_qc": get_value(pres_qc, prof_idx, level_idx),
-                            "temp_qc": get_value(temp_qc, prof_idx, level_idx),
-                            "psal_qc": get_value(salt_qc, prof_idx, level_idx),
-                            "temperature_adj": get_value(temp_adj, prof_idx, level_idx),
-                            "salinity_adj": get_value(salt_adj, prof_idx, level_idx),
-                            "pressure_adj": get_value(pres_adj, prof_idx, level_idx),
-                            "temp_adj_qc": get_value(temp_adj_qc, prof_idx, level_idx),
-                            "psal_adj_qc": get_value(salt_adj_qc, prof_idx, level_idx),
-                            "data_mode": mode_char,
-                            "oxygen": get_value(oxygen, prof_idx, level_idx),
-                            "oxygen_qc": get_value(oxygen_qc, prof_idx, level_idx),
-                            "chlorophyll": get_value(chlorophyll, prof_idx, level_idx),
-                            "chlorophyll_qc": get_value(
-                                chlorophyll_qc, prof_idx, level_idx
-                            ),
-                            "nitrate": get_value(nitrate, prof_idx, level_idx),
-                            "nitrate_qc": get_value(nitrate_qc, prof_idx, level_idx),
-                            "year": year,
-                            "month": month,
-                        }
-                        rows.append(row)
-
-                if not rows:
+                # One row = one measurement at one depth; levels without pressure are dropped.
+                # Rows are gathered at the row-major indices of this mask, so they stay
+                # in profile-by-profile, level-by-level order.
+                valid = ~np.isnan(pres.values)
+                if not valid.any():
                     logger.warning("No valid measurements extracted", float_id=float_id)
                     return None
 
-                # Build Arrow table from rows - convert list of dicts to columnar format
-                columns = {}
-                for row in rows:
-                    for key, value in row.items():
-                        if key not in columns:
-                            columns[key] = []
-                        columns[key].append(value)
-
-                table = pa.table(columns)
-
-                # Write Parquet file
-                output_path = self.staging_path / f"{float_id}_profiles.parquet"
-                pq.write_table(
-                    table,
+                # Write Parquet file one row group per block of profiles
+                with pq.ParquetWriter(
                     output_path,
+                    PROFILE_SCHEMA,
                     compression=settings.PARQUET_COMPRESSION,
-                    use_dictionary=["float_id", "cycle_number", "data_mode"],
-                )
+                    use_dictionary=DICTIONARY_COLUMNS,
+                ) as writer:
+                    for start in range(0, n_prof, PROFILES_PER_ROW_GROUP):
+                        block = slice(start, start + PROFILES_PER_ROW_GROUP)
+                        if valid[block].any():
+                            writer.write_table(
+                                _profile_block(ds, block, valid[block], float_id)
+                            )
 
                 return str(output_path)
 
         except Exception as e:
+            # Don't leave a truncated file behind for the uploader
+            output_path.unlink(missing_ok=True)
             logger.exception(
                 "Parquet conversion failed", float_id=float_id, error=str(e)
             )
@@ -4,6 +4,7 @@ from typing import Any, Optional
 
 import numpy as np
 import xarray as xr
+from xarray.coding.times import decode_cf_datetime
 
 from ... import FloatMetadata, get_logger
 from ...utils.helper import Helper
@@ -13,6 +14,16 @@ from ...utils.helper import Helper
 logger = get_logger(__name__)
 helper_instance = Helper()
 
+# TECHNICAL_PARAMETER_NAME substrings that carry a battery voltage reading
+BATTERY_VOLTAGE_KEYWORDS = (
+    "BatteryParkNoLoad",
+    "BatteryInitialAtProfileDepth",
+    "VOLTAGE_Battery",
+    "Battery voltage",
+)
+# The same keywords for matching raw char arrays without decoding them first
+_BATTERY_VOLTAGE_KEYWORDS_BYTES = tuple(kw.encode() for kw in BATTERY_VOLTAGE_KEYWORDS)
+
 
 def extract_string(ds: xr.Dataset, var_name: str) -> Optional[str]:
     """Extract and clean string from xarray dataset."""
@@ -28,9 +39,8 @@ def extract_string(ds: xr.Dataset, var_name: str) -> Optional[str]:
     return str(val) if val else None
 
 
-def parse_date(ds: xr.Dataset, var_name: str) -> Optional[datetime]:
-    """Parse date from xarray dataset."""
-    date_str = extract_string(ds, var_name)
+def parse_date(date_str: str | None) -> datetime | None:
+    """Parse a YYYYMMDD[HHMMSS] date string (see extract_string)."""
     if not date_str or date_str.isspace():
         return None
     try:
@@ -47,11 +57,22 @@ def parse_date(ds: xr.Dataset, var_name: str) -> Optional[datetime]:
 
 
 def parse_metadata_file(
-    file_path: Path, recent_profile_time: Optional[datetime] = None
+    file_path: Path,
+    recent_profile_time: datetime | None = None,
+    *,
+    now: datetime | None = None,
 ) -> Optional[FloatMetadata]:
     """Parse {float_id}_meta.nc - returns FloatMetadata model instance."""
     try:
-        with xr.open_dataset(file_path) as ds:
+        # meta.nc dates are char fields (see parse_date), so skip CF time decoding.
+        # Masking and char concatenation stay on for LAUNCH_* fills and PARAMETER.
+        with xr.open_dataset(
+            file_path,
+            engine="netcdf4",
+            decode_times=False,
+            decode_timedelta=False,
+            cache=False,
+        ) as ds:
             # Extract launch location
             launch_lat = None
             launch_lon = None
@@ -68,10 +89,14 @@ def parse_metadata_file(
             except Exception:
                 pass
 
-            # Build validated metadata using Pydantic model
+            # Read once; the file is opened with cache=False so every access hits disk
+            platform_number = extract_string(ds, "PLATFORM_NUMBER")
+            end_mission_date = extract_string(ds, "END_MISSION_DATE")
+
+            # Build the metadata row
             metadata = FloatMetadata(
-                float_id=int(extract_string(ds, "PLATFORM_NUMBER") or 0),
-                wmo_number=extract_string(ds, "PLATFORM_NUMBER") or "",
+                float_id=int(platform_number or 0),
+                wmo_number=platform_number or "",
                 data_centre=extract_string(ds, "DATA_CENTRE") or "",
                 project_name=extract_string(ds, "PROJECT_NAME"),
                 operating_institution=extract_string(ds, "OPERATING_INSTITUTION"),
@@ -79,13 +104,15 @@ def parse_metadata_file(
                 platform_type=extract_string(ds, "PLATFORM_TYPE"),
                 platform_maker=extract_string(ds, "PLATFORM_MAKER"),
                 float_serial_no=extract_string(ds, "FLOAT_SERIAL_NO"),
-                launch_date=parse_date(ds, "LAUNCH_DATE"),
-                start_mission_date=parse_date(ds, "START_DATE"),
-                end_mission_date=parse_date(ds, "END_MISSION_DATE"),
+                launch_date=parse_date(extract_string(ds, "LAUNCH_DATE")),
+                start_mission_date=parse_date(extract_string(ds, "START_DATE")),
+                end_mission_date=parse_date(end_mission_date),
                 launch_lat=launch_lat,
                 launch_lon=launch_lon,
                 float_type=helper_instance.classify_float_type(ds),
-                status=helper_instance.determine_float_status(ds, recent_profile_time),
+                status=helper_instance.determine_float_status(
+                    end_mission_date, recent_profile_time, now=now
+                ),
             )
 
             return metadata
@@ -95,12 +122,21 @@ def parse_metadata_file(
         return None
 
 
-def get_profile_stats(
-    file_path: Path, metadata: Optional["FloatMetadata"] = None
-) -> Optional[dict[str, Any]]:
-    """Extract latest profile + battery health for argo_float_status table."""
+def get_profile_stats(file_path: Path) -> Optional[dict[str, Any]]:
+    """Extract the latest profile for argo_float_status table.
+
+    Battery health comes from `get_battery_percent`.
+    """
     try:
-        with xr.open_dataset(file_path) as ds:
+        # Only the last profile is read, so skip caching and whole-array time
+        # decoding; JULD[last_idx] is decoded below
+        with xr.open_dataset(
+            file_path,
+            engine="netcdf4",
+            decode_times=False,
+            decode_timedelta=False,
+            cache=False,
+        ) as ds:
             n_prof = ds.sizes.get("N_PROF", 0)
             if n_prof == 0:
                 return None
@@ -110,25 +146,33 @@ def get_profile_stats(
 
             summary: dict[str, Any] = {"float_id": float_id}
 
+            # Index the variables before .values so only the last profile is
+            # read from disk, not the whole N_PROF (x N_LEVELS) array
+
             # Location
             if "LATITUDE" in ds:
-                lat = float(ds["LATITUDE"].values[last_idx])
+                lat = float(ds["LATITUDE"][last_idx].values)
                 if not np.isnan(lat):
                     summary["latitude"] = lat
             if "LONGITUDE" in ds:
-                lon = float(ds["LONGITUDE"].values[last_idx])
+                lon = float(ds["LONGITUDE"][last_idx].values)
                 if not np.isnan(lon):
                     summary["longitude"] = lon
 
             # Cycle & time
             if "CYCLE_NUMBER" in ds:
-                cycle = ds["CYCLE_NUMBER"].values[last_idx]
+                cycle = ds["CYCLE_NUMBER"][last_idx].values
                 if not np.isnan(cycle):
                     summary["cycle_number"] = int(cycle)
 
             if "JULD" in ds:
                 try:
-                    juld = ds["JULD"].values[last_idx]
+                    juld_var = ds["JULD"]
+                    juld = decode_cf_datetime(
+                        juld_var[last_idx : last_idx + 1].values,
+                        juld_var.attrs["units"],
+                        juld_var.attrs.get("calendar"),
+                    )[0]
                     if not np.isnat(juld):
                         ts = (
                             juld - np.datetime64("1970-01-01T00:00:00")
@@ -146,89 +190,121 @@ def get_profile_stats(
                 ("PSAL", "last_salinity"),
             ]:
                 if var in ds:
-                    arr = ds[var].values[last_idx]
-                    valid = arr[~np.isnan(arr) & (arr < 99999)]
-                    if len(valid) > 0:
-                        summary[key] = float(
-                            valid.max() if var == "PRES" else valid[-1]
-                        )
+                    arr = ds[var][last_idx].values
+                    # NaN compares False, so one test drops NaNs and fill values
+                    valid = arr < 99999
+                    if not valid.any():
+                        continue
+                    if var == "PRES":
+                        summary[key] = float(arr.max(where=valid, initial=-np.inf))
+                    else:
+                        # Last valid level, without copying the valid values out
+                        summary[key] = float(arr[valid.size - 1 - valid[::-1].argmax()])
 
-            # BATTERY ESTIMATION
-            if metadata:
-                tech_file = file_path.parent / f"{float_id}_tech.nc"
-                current_voltage = None
+            return summary
 
-                if tech_file.exists():
-                    current_voltage = _extract_latest_battery_voltage(tech_file)
+    except Exception as e:
+        logger.error("Failed to extract profile stats", file=file_path, error=str(e))
+        return None
 
-                platform_type = metadata.platform_type or "UNKNOWN"
-                cycle_number = summary.get("cycle_number", 0)
 
-                battery_percent = helper_instance.estimate_battery_percent(
-                    platform_type=platform_type,
-                    cycle_number=cycle_number,
-                    current_voltage=current_voltage,
-                    metadata=metadata,  # <- contains battery_packs + launch_date
-                )
+def get_battery_percent(
+    tech_file: Path, metadata: FloatMetadata, cycle_number: int
+) -> int | None:
+    """Estimate battery health from tech.nc, falling back to the cycle count."""
+    current_voltage = None
+    if tech_file.exists():
+        current_voltage = _extract_latest_battery_voltage(tech_file)
 
-                if battery_percent is not None:
-                    summary["battery_percent"] = battery_percent
+    return helper_instance.estimate_battery_percent(
+        platform_type=metadata.platform_type or "UNKNOWN",
+        cycle_number=cycle_number,
+        current_voltage=current_voltage,
+        metadata=metadata,  # <- contains battery_packs + launch_date
+    )
 
-            return summary
 
-    except Exception as e:
-        logger.error("Failed to extract profile stats", file=file_path, error=str(e))
-        return None
+def _as_text(values: np.ndarray) -> np.ndarray:
+    """Flatten a char/bytes array into a unicode array."""
+    flat = values.ravel()
+    if flat.dtype.kind == "O":
+        is_bytes = flat.size > 0 and isinstance(flat[0], bytes)
+        flat = flat.astype("S" if is_bytes else "U")
+    if flat.dtype.kind == "S":
+        return np.char.decode(flat, "utf-8", errors="ignore")
+    return flat.astype(str)
+
+
+def _to_voltages(values: np.ndarray) -> np.ndarray:
+    """Parse voltage strings, NaN where a value isn't a number."""
+    try:
+        return np.char.strip(values).astype(np.float64)
+    except ValueError:
+        out = np.full(values.shape, np.nan)
+        for i, text in enumerate(values.tolist()):
+            try:
+                out[i] = float(text)
+            except ValueError:
+                pass
+        return out
 
 
 def _extract_latest_battery_voltage(tech_file: Path) -> float | None:
     """Extract only the latest battery voltage from tech.nc"""
     try:
-        with xr.open_dataset(tech_file) as ds:
+        with xr.open_dataset(
+            tech_file,
+            engine="netcdf4",
+            decode_times=False,
+            decode_timedelta=False,
+            cache=False,
+        ) as ds:
             if (
                 "TECHNICAL_PARAMETER_NAME" not in ds
                 or "TECHNICAL_PARAMETER_VALUE" not in ds
             ):
                 return None
 
-            names = ds["TECHNICAL_PARAMETER_NAME"].values.flatten()
-            values = ds["TECHNICAL_PARAMETER_VALUE"].values.flatten()
-
-            target_keywords = [
-                "BatteryParkNoLoad",
-                "BatteryInitialAtProfileDepth",
-                "VOLTAGE_Battery",
-                "Battery voltage",
-            ]
-
-            latest_voltage = None
-            latest_cycle = -1
+            names = ds["TECHNICAL_PARAMETER_NAME"].values.ravel()
+            values = ds["TECHNICAL_PARAMETER_VALUE"].values.ravel()
+
+            # Match every keyword against all names at once, then only parse
+            # the values of the matching rows. Byte names are searched as-is,
+            # decoding thousands of names costs more than the search itself.
+            if names.dtype.kind == "S":
+                keywords = _BATTERY_VOLTAGE_KEYWORDS_BYTES
+            else:
+                names = _as_text(names)
+                keywords = BATTERY_VOLTAGE_KEYWORDS
+            matched = np.zeros(names.shape, dtype=bool)
+            for kw in keywords:
+                matched |= np.char.find(names, kw) >= 0
+            (idx,) = np.nonzero(matched[: values.size])
+            if idx.size == 0:
+                return None
 
-            cycle_nums = (
-                ds["CYCLE_NUMBER"].values.flatten() if "CYCLE_NUMBER" in ds else []
-            )
+            voltages = _to_voltages(_as_text(values[idx]))
 
-            for i, name_bytes in enumerate(names):
-                name = (
-                    name_bytes.decode("utf-8", errors="ignore")
-                    if isinstance(name_bytes, bytes)
-                    else str(name_bytes)
+            # Rows past the end of CYCLE_NUMBER count as cycle 0
+            cycles = np.zeros(idx.size, dtype=np.float64)
+            if "CYCLE_NUMBER" in ds:
+                cycle_nums = ds["CYCLE_NUMBER"].values.ravel()
+                has_cycle = idx < cycle_nums.size
+                cycles[has_cycle] = np.trunc(
+                    cycle_nums[idx[has_cycle]].astype(np.float64)
                 )
-                if any(kw in name for kw in target_keywords):
-                    try:
-                        val_str = values[i]
-                        if isinstance(val_str, bytes):
-                            val_str = val_str.decode("utf-8", errors="ignore")
-                        voltage = float(val_str)
-                        if 5.0 <= voltage <= 35.0:  # Covers Deep Arvor
-                            cycle = int(cycle_nums[i]) if i < len(cycle_nums) else 0
-                            if cycle >= latest_cycle:
-                                latest_voltage = voltage
-                                latest_cycle = cycle
-                    except Exception:
-                        continue
 
-            return latest_voltage
+            keep = (voltages >= 5.0) & (voltages <= 35.0)  # Covers Deep Arvor
+            keep &= ~np.isnan(cycles)
+            if not keep.any():
+                return None
+            voltages = voltages[keep]
+            cycles = cycles[keep]
+
+            # Ties on the highest cycle go to the last row, as the file is in
+            # cycle order
+            last = cycles.size - 1 - int(np.argmax(cycles[::-1]))
+            return float(voltages[last])
 
     except Exception as e:
         logger.debug("No battery voltage found", file=tech_file, error=str(e))
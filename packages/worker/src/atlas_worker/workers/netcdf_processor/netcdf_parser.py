@@ -1,28 +1,56 @@
+import multiprocessing
+import os
 import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from ... import get_logger, settings
 from .converter import ParquetConverter
 from .netcdf_aggregate_parser import (
+    get_battery_percent,
     get_profile_stats,
     parse_metadata_file,
 )
 
 logger = get_logger(__name__)
 
+# Thread pool size when a process pool can't be used
+MAX_PARSE_THREADS = 8
+
+# Per-process parser used by the parse pool workers
+_worker_parser: "NetCDFParserWorker | None" = None
+
+
+def _init_parse_worker(stage_path: Path) -> None:
+    global _worker_parser
+    _worker_parser = NetCDFParserWorker(stage_path=stage_path)
+
+
+def _parse_in_worker(float_id: str, now: datetime | None = None) -> dict[str, Any]:
+    assert _worker_parser is not None
+    return _worker_parser.process_directory(float_id, now=now)
+
 
 class NetCDFParserWorker:
     """Extract ARGO metadata and status for PostgreSQL."""
 
     def __init__(self, stage_path: Path | None = None):
         self.stage_path = Path(stage_path or settings.LOCAL_STAGE_PATH)
+        # One converter per worker, so the staging dir is created once
+        self._converter = ParquetConverter()
 
-    def process_directory(self, float_id: str) -> dict[str, Any]:
+    def process_directory(
+        self, float_id: str, now: datetime | None = None
+    ) -> dict[str, Any]:
         """Main Gateway: Extract metadata and status for a specific float.
 
         Args:
             float_id: Float ID to process
+            now: Reference time for the float status; a batch passes one value
 
         Returns:
             Stats Dict containing metadata, status, parquet path, and processing stats
@@ -41,12 +69,11 @@ class NetCDFParserWorker:
             "parquet_path": None,
         }
 
-        self._prepare_pg_data(float_dir, float_id, stats)
+        self._prepare_pg_data(float_dir, float_id, stats, now)
 
         # Convert to Parquet for R2 staging
         prof_file = float_dir / f"{float_id}_prof.nc"
-        converter = ParquetConverter()
-        parquet_path = converter.convert(prof_file, float_id)
+        parquet_path = self._converter.convert(prof_file, float_id)
         if parquet_path:
             stats["parquet_path"] = parquet_path
             logger.debug(
@@ -55,20 +82,82 @@ class NetCDFParserWorker:
 
         return stats
 
+    def parse_executor(
+        self,
+        float_count: int,
+        max_workers: int | None = None,
+        max_threads: int = MAX_PARSE_THREADS,
+    ) -> tuple[Executor, Callable[[str], dict[str, Any]]]:
+        """Pick the executor for parsing `float_count` floats and the callable to run on it.
+
+        Parsing is CPU-bound (decompression, numpy conversion) and holds the GIL,
+        so several floats go to a process pool; each worker builds its own parser
+        and reads the float's files from disk. A single float, or environments
+        without multiprocessing support (e.g. AWS Lambda has no /dev/shm), use
+        threads instead.
+
+        Args:
+            float_count: Number of floats that will be submitted
+            max_workers: Process pool size cap (defaults to the CPU count)
+            max_threads: Thread pool size cap for the fallback
+        """
+        if float_count > 1:
+            try:
+                # spawn, not fork: callers may already run an event loop and pool threads
+                executor = ProcessPoolExecutor(
+                    max_workers=min(float_count, max_workers or os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_parse_worker,
+                    initargs=(self.stage_path,),
+                )
+                return executor, _parse_in_worker
+            except OSError as e:
+                logger.debug("Process pool unavailable, using threads", error=str(e))
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(float_count, max_threads)))
+        return executor, self.process_directory
+
+    def process_directories(
+        self, float_ids: list[str], max_workers: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Process several floats in parallel, one float per worker.
+
+        Runs `process_directory` on the `parse_executor` pool; every float in
+        the batch is judged against the same reference time.
+
+        Args:
+            float_ids: Float IDs to process
+            max_workers: Process pool size cap (defaults to the CPU count)
+
+        Returns:
+            Stats dicts in the same order as `float_ids` (see `process_directory`)
+        """
+        if not float_ids:
+            return []
+        executor, process = self.parse_executor(len(float_ids), max_workers)
+        process = partial(process, now=datetime.now(UTC))
+        with executor:
+            return list(executor.map(process, float_ids))
+
     def _prepare_pg_data(
-        self, float_dir: Path, float_id: str, stats: dict[str, Any]
+        self,
+        float_dir: Path,
+        float_id: str,
+        stats: dict[str, Any],
+        now: datetime | None = None,
     ) -> None:
         """Extract metadata and status from NetCDF files.
 
         Processing order:
         1. Get latest profile time from prof.nc (for status determination)
         2. Extract full metadata using the profile time
-        3. Re-extract profile stats with battery estimation using metadata
+        3. Add the battery estimate to the step 1 stats using metadata
 
         Args:
             float_dir: Float directory path
             float_id: Float ID
             stats: Statistics dict to update
+            now: Reference time for the float status (defaults to the current time)
         """
         prof_file = float_dir / f"{float_id}_prof.nc"
         latest_profile_time = None
@@ -102,7 +191,9 @@ class NetCDFParserWorker:
         meta_file = float_dir / f"{float_id}_meta.nc"
         if meta_file.exists():
             try:
-                stats["metadata"] = parse_metadata_file(meta_file, latest_profile_time)
+                stats["metadata"] = parse_metadata_file(
+                    meta_file, latest_profile_time, now=now
+                )
                 stats["files_processed"] += 1
                 if stats["metadata"]:
                     logger.debug(
@@ -120,18 +211,22 @@ class NetCDFParserWorker:
             logger.error("Metadata file not found", float_id=float_id)
             stats["errors"] += 1
 
-        # Step 3: Re-extract profile stats with battery estimation
-        if prof_file.exists() and stats.get("metadata"):
+        # Step 3: Add battery estimation (reads tech.nc only, prof.nc stats are reused)
+        status_summary = stats.get("status")
+        if status_summary and stats.get("metadata"):
             try:
-                status_summary = get_profile_stats(prof_file, stats["metadata"])
-                if status_summary:
-                    stats["status"] = status_summary
-                    if "battery_percent" in status_summary:
-                        logger.debug(
-                            "Battery estimation completed",
-                            float_id=float_id,
-                            battery_percent=status_summary["battery_percent"],
-                        )
+                battery_percent = get_battery_percent(
+                    float_dir / f"{float_id}_tech.nc",
+                    stats["metadata"],
+                    status_summary.get("cycle_number", 0),
+                )
+                if battery_percent is not None:
+                    status_summary["battery_percent"] = battery_percent
+                    logger.debug(
+                        "Battery estimation completed",
+                        float_id=float_id,
+                        battery_percent=battery_percent,
+                    )
             except Exception as e:
                 logger.warning(
                     "Battery estimation failed", float_id=float_id, error=str(e)
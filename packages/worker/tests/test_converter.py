@@ -0,0 +1,158 @@
+import math
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+import xarray as xr
+
+from atlas_worker.workers.netcdf_processor import converter
+from atlas_worker.workers.netcdf_processor.converter import (
+    PROFILE_SCHEMA,
+    ParquetConverter,
+)
+
+FLOAT_ID = "2902224"
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+N_PROF = 5
+N_LEVELS = 6
+
+# (column, variable) pairs written per level and per profile
+LEVEL_FLOATS = [
+    ("pressure", "PRES"),
+    ("temperature", "TEMP"),
+    ("salinity", "PSAL"),
+    ("pressure_adj", "PRES_ADJUSTED"),
+    ("temperature_adj", "TEMP_ADJUSTED"),
+    ("salinity_adj", "PSAL_ADJUSTED"),
+    ("oxygen", "OXYGEN"),
+]
+LEVEL_FLAGS = [
+    ("pres_qc", "PRES_QC"),
+    ("temp_qc", "TEMP_QC"),
+    ("psal_qc", "PSAL_QC"),
+    ("temp_adj_qc", "TEMP_ADJUSTED_QC"),
+    ("psal_adj_qc", "PSAL_ADJUSTED_QC"),
+    ("oxygen_qc", "OXYGEN_QC"),
+]
+PROFILE_FLAGS = [("position_qc", "POSITION_QC"), ("data_mode", "DATA_MODE")]
+
+
+@pytest.fixture
+def prof_file(tmp_path):
+    """A small prof.nc with the fill patterns real GDAC files have."""
+    rng = np.random.default_rng(0)
+    dims = ("N_PROF", "N_LEVELS")
+
+    pres = np.sort(rng.uniform(0, 2000, (N_PROF, N_LEVELS)), axis=1).astype("f4")
+    pres[:, -2:] = np.nan  # trailing fill levels
+    pres[1, 2] = np.nan  # a gap mid-profile
+    pres[3, :] = np.nan  # a profile with no levels at all
+
+    data = {
+        # Padded char field; a blank id falls back to the directory's float id
+        "PLATFORM_NUMBER": (
+            "N_PROF",
+            np.array(
+                [f"{fid:<8}" for fid in [FLOAT_ID, FLOAT_ID, "", FLOAT_ID, FLOAT_ID]],
+                dtype="S8",
+            ),
+        ),
+        "CYCLE_NUMBER": ("N_PROF", np.arange(1, N_PROF + 1, dtype="f8")),
+        "JULD": (
+            "N_PROF",
+            np.array([27000.0, np.nan, 27020.5, 27030.0, 27040.123456789]),
+            {"units": "days since 1950-01-01 00:00:00 UTC"},
+        ),
+        "LATITUDE": ("N_PROF", rng.uniform(-10, 10, N_PROF)),
+        "LONGITUDE": ("N_PROF", rng.uniform(60, 90, N_PROF)),
+        "POSITION_QC": ("N_PROF", np.array([b"1", b"1", b"8", b"1", b"1"])),
+        "DATA_MODE": ("N_PROF", np.array([b"R", b" ", b"D", b"A", b"D"])),
+        "PRES": (dims, pres),
+    }
+    for _, var in LEVEL_FLOATS[1:]:
+        values = rng.uniform(0, 40, (N_PROF, N_LEVELS)).astype("f4")
+        values[0, 1] = np.nan
+        data[var] = (dims, values)
+    for _, var in LEVEL_FLAGS:
+        data[var] = (dims, rng.choice([b"1", b"2", b"4", b" "], (N_PROF, N_LEVELS)))
+
+    ds = xr.Dataset(data)
+    # Char fill: the " " flags come back masked (NaN in an object array)
+    encoding = {var: {"_FillValue": b" "} for var in ("TEMP_QC", "DATA_MODE")}
+    path = tmp_path / f"{FLOAT_ID}_prof.nc"
+    ds.to_netcdf(path, engine="netcdf4", encoding=encoding)
+    return path
+
+
+def flag(value) -> str | None:
+    if isinstance(value, float):
+        return None  # masked fill
+    return value.decode().strip() if isinstance(value, bytes) else value.strip()
+
+
+def number(value) -> float | None:
+    return None if math.isnan(value) else float(value)
+
+
+def expected_rows(path) -> list[dict]:
+    """Row-by-row reference: one row per profile level that has a pressure."""
+    rows = []
+    with xr.open_dataset(path, engine="netcdf4") as ds:
+        for p in range(ds.sizes["N_PROF"]):
+            platform = flag(ds["PLATFORM_NUMBER"].values[p]) or FLOAT_ID
+            juld = ds["JULD"].values[p]
+            timestamp = None
+            if not np.isnat(juld):
+                # Nearest microsecond, as datetime would round it
+                nanos = int(juld.astype("datetime64[ns]").astype(np.int64))
+                timestamp = EPOCH + timedelta(microseconds=(nanos + 500) // 1000)
+            for level in range(ds.sizes["N_LEVELS"]):
+                if np.isnan(ds["PRES"].values[p, level]):
+                    continue
+                row = {column: None for column in PROFILE_SCHEMA.names}
+                row |= {
+                    "float_id": int(platform),
+                    "cycle_number": float(ds["CYCLE_NUMBER"].values[p]),
+                    "level": level,
+                    "profile_timestamp": timestamp,
+                    "latitude": float(ds["LATITUDE"].values[p]),
+                    "longitude": float(ds["LONGITUDE"].values[p]),
+                    "year": timestamp.year if timestamp else None,
+                    "month": timestamp.month if timestamp else None,
+                }
+                for column, var in LEVEL_FLOATS:
+                    row[column] = number(ds[var].values[p, level])
+                for column, var in LEVEL_FLAGS:
+                    row[column] = flag(ds[var].values[p, level])
+                for column, var in PROFILE_FLAGS:
+                    row[column] = flag(ds[var].values[p])
+                rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("profiles_per_row_group", [256, 2])
+def test_convert_matches_row_by_row_reference(
+    prof_file, tmp_path, monkeypatch, profiles_per_row_group
+):
+    monkeypatch.setattr(converter, "PROFILES_PER_ROW_GROUP", profiles_per_row_group)
+
+    output = ParquetConverter(staging_path=tmp_path / "out").convert(
+        prof_file, FLOAT_ID
+    )
+
+    assert output is not None
+    table = pq.read_table(output)
+    assert table.schema.equals(PROFILE_SCHEMA)
+    assert table.to_pylist() == expected_rows(prof_file)
+
+
+def test_convert_without_pressure_writes_nothing(tmp_path):
+    path = tmp_path / f"{FLOAT_ID}_prof.nc"
+    xr.Dataset(
+        {"PRES": (("N_PROF", "N_LEVELS"), np.full((2, 3), np.nan, dtype="f4"))}
+    ).to_netcdf(path, engine="netcdf4")
+
+    staging = tmp_path / "out"
+    assert ParquetConverter(staging_path=staging).convert(path, FLOAT_ID) is None
+    assert list(staging.iterdir()) == []
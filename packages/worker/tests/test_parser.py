@@ -0,0 +1,49 @@
+import numpy as np
+import pyarrow.parquet as pq
+import xarray as xr
+
+from atlas_worker.workers.netcdf_processor.netcdf_parser import NetCDFParserWorker
+
+FLOAT_IDS = ["2902224", "2902225", "2902226"]
+
+
+def write_prof(stage_path, float_id: str, n_prof: int) -> None:
+    float_dir = stage_path / float_id
+    float_dir.mkdir(parents=True)
+    pres = np.tile(np.array([5.0, 50.0, np.nan], dtype="f4"), (n_prof, 1))
+    xr.Dataset(
+        {
+            "PLATFORM_NUMBER": ("N_PROF", np.full(n_prof, float_id, dtype="S8")),
+            "CYCLE_NUMBER": ("N_PROF", np.arange(1, n_prof + 1, dtype="f8")),
+            "JULD": (
+                "N_PROF",
+                27000.0 + np.arange(n_prof),
+                {"units": "days since 1950-01-01 00:00:00 UTC"},
+            ),
+            "LATITUDE": ("N_PROF", np.zeros(n_prof)),
+            "LONGITUDE": ("N_PROF", np.full(n_prof, 70.0)),
+            "PRES": (("N_PROF", "N_LEVELS"), pres),
+        }
+    ).to_netcdf(float_dir / f"{float_id}_prof.nc", engine="netcdf4")
+
+
+def test_process_directories_keeps_input_order(tmp_path, monkeypatch):
+    # Pool processes build their own converter from the environment
+    monkeypatch.setenv("PARQUET_STAGING_PATH", str(tmp_path / "parquet"))
+    stage_path = tmp_path / "raw"
+    for n_prof, float_id in enumerate(FLOAT_IDS[:2], start=2):
+        write_prof(stage_path, float_id, n_prof)
+
+    results = NetCDFParserWorker(stage_path=stage_path).process_directories(
+        FLOAT_IDS, max_workers=2
+    )
+
+    assert [r["float_id"] for r in results] == FLOAT_IDS
+    for n_prof, result in enumerate(results[:2], start=2):
+        assert result["status"]["cycle_number"] == n_prof
+        assert pq.read_table(result["parquet_path"]).num_rows == 2 * n_prof
+    assert results[2]["error"] == "Directory not found"
+
+
+def test_process_directories_empty_batch(tmp_path):
+    assert NetCDFParserWorker(stage_path=tmp_path).process_directories([]) == []
@@ -0,0 +1,69 @@
+import struct
+from datetime import UTC, datetime
+
+from atlas_worker.db.pg import (
+    METADATA_COLUMNS,
+    METADATA_STAGE_SQL,
+    STATUS_COLUMNS,
+    _copy_text,
+    _ewkb_point,
+    _metadata_row,
+    _status_row,
+)
+from atlas_worker.models.argo import FloatMetadata, FloatStatus
+
+NOW = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+
+def test_ewkb_point_is_srid_4326_little_endian():
+    # Same bytes PostGIS prints for ST_AsEWKB('SRID=4326;POINT(72.5 -4.25)')
+    assert _ewkb_point(72.5, -4.25) == (
+        "0101000020e6100000000000000020524000000000000011c0"
+    )
+    order, type_, srid, x, y = struct.unpack("<BIIdd", bytes.fromhex(_ewkb_point(1, 2)))
+    assert (order, type_, srid, x, y) == (1, 0x20000001, 4326, 1.0, 2.0)
+
+
+def test_copy_text_escapes_and_nulls():
+    buf = _copy_text(
+        [
+            (1, None, "a\tb\\c\nd\re", NOW, 1.5),
+            (2, "plain", "", None, None),
+        ]
+    )
+    assert buf.read() == (
+        "1\t\\N\ta\\tb\\\\c\\nd\\re\t2024-01-02T03:04:05+00:00\t1.5\n"
+        "2\tplain\t\t\\N\t\\N\n"
+    )
+
+
+def test_rows_follow_column_order():
+    metadata = FloatMetadata(
+        float_id=2902224, wmo_number="2902224", data_centre="IN", pi_name="PI"
+    )
+    row = _metadata_row(metadata, NOW)
+    assert len(row) == len(METADATA_COLUMNS)
+    assert dict(zip(METADATA_COLUMNS, row)) == {
+        **{col: None for col in METADATA_COLUMNS},
+        "float_id": 2902224,
+        "wmo_number": "2902224",
+        "status": "UNKNOWN",
+        "float_type": "unknown",
+        "data_centre": "IN",
+        "pi_name": "PI",
+        "updated_at": NOW,
+    }
+
+    status = FloatStatus(
+        float_id=2902224, latitude=-4.25, longitude=72.5, cycle_number=3
+    )
+    row = dict(zip(STATUS_COLUMNS, _status_row(status, NOW)))
+    assert row["location"] == _ewkb_point(72.5, -4.25)
+    assert row["cycle_number"] == 3
+    assert row["updated_at"] == NOW
+
+
+def test_merge_fills_schema_defaults_for_nulls():
+    merge_sql = METADATA_STAGE_SQL[2]
+    assert "COALESCE(s.status, t.status, 'UNKNOWN')" in merge_sql
+    assert "COALESCE(s.float_type, t.float_type, 'unknown')" in merge_sql
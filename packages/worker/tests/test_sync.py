@@ -0,0 +1,183 @@
+import asyncio
+import os
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import httpx
+import pytest
+
+from atlas_worker.workers.argo_sync import sync
+from atlas_worker.workers.argo_sync.sync import (
+    AdaptiveLimiter,
+    ArgoSyncWorker,
+    _stamp_last_modified,
+    _write_all,
+)
+
+URL = "https://gdac.test/dac/incois/2902224/2902224_prof.nc"
+BODY = bytes(range(256)) * 40
+LAST_MODIFIED = "Wed, 01 May 2024 12:00:00 GMT"
+
+
+def gdac(
+    body: bytes = BODY,
+    last_modified: str = LAST_MODIFIED,
+    content_range: str | None = None,
+):
+    """Mock GDAC serving one file, honouring Range only when If-Range matches."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        headers = {"Last-Modified": last_modified}
+        range_ = request.headers.get("Range")
+        if range_ and request.headers.get("If-Range") == last_modified:
+            start = int(range_.removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                return httpx.Response(
+                    416, headers={"Content-Range": f"bytes */{len(body)}"}
+                )
+            headers["Content-Range"] = (
+                content_range or f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+            return httpx.Response(206, content=body[start:], headers=headers)
+        return httpx.Response(200, content=body, headers=headers)
+
+    return handler, requests
+
+
+def fetch(tmp_path: Path, handler, file_path: Path) -> bool:
+    async def run() -> bool:
+        worker = ArgoSyncWorker(stage_path=tmp_path)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await worker._fetch(client, URL, file_path)
+
+    return asyncio.run(run())
+
+
+def partial_file(tmp_path: Path, data: bytes, last_modified: str) -> Path:
+    file_path = tmp_path / "2902224_prof.nc"
+    file_path.write_bytes(data)
+    _stamp_last_modified(file_path, last_modified)
+    return file_path
+
+
+def test_fetch_downloads_and_stamps_last_modified(tmp_path):
+    handler, requests = gdac()
+    file_path = tmp_path / "2902224_prof.nc"
+
+    assert fetch(tmp_path, handler, file_path) is True
+    assert file_path.read_bytes() == BODY
+    assert "Range" not in requests[0].headers
+    assert file_path.stat().st_mtime == parsedate_to_datetime(LAST_MODIFIED).timestamp()
+
+
+def test_fetch_resumes_partial_file(tmp_path):
+    handler, requests = gdac()
+    file_path = partial_file(tmp_path, BODY[:1000], LAST_MODIFIED)
+
+    assert fetch(tmp_path, handler, file_path) is True
+    assert requests[0].headers["Range"] == "bytes=1000-"
+    assert requests[0].headers["If-Range"] == LAST_MODIFIED
+    assert file_path.read_bytes() == BODY
+
+
+def test_fetch_skips_complete_file(tmp_path):
+    handler, _ = gdac()
+    file_path = partial_file(tmp_path, BODY, LAST_MODIFIED)
+
+    assert fetch(tmp_path, handler, file_path) is False
+    assert file_path.read_bytes() == BODY
+
+
+def test_fetch_restarts_when_remote_file_changed(tmp_path):
+    # If-Range doesn't match, so the server sends the whole new file (200)
+    handler, _ = gdac()
+    file_path = partial_file(tmp_path, b"stale" * 100, "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert fetch(tmp_path, handler, file_path) is True
+    assert file_path.read_bytes() == BODY
+
+
+def test_fetch_rejects_unexpected_content_range(tmp_path):
+    handler, _ = gdac(content_range=f"bytes 0-{len(BODY) - 1}/{len(BODY)}")
+    file_path = partial_file(tmp_path, BODY[:1000], LAST_MODIFIED)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        fetch(tmp_path, handler, file_path)
+    assert not file_path.exists()
+
+
+def test_fetch_discards_file_shorter_than_content_range(tmp_path):
+    # Total in Content-Range says the file is longer than what we end up with
+    handler, _ = gdac(content_range=f"bytes 1000-{len(BODY)}/{len(BODY) + 1}")
+    file_path = partial_file(tmp_path, BODY[:1000], LAST_MODIFIED)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        fetch(tmp_path, handler, file_path)
+    assert not file_path.exists()
+
+
+def test_write_all_finishes_short_writes(tmp_path, monkeypatch):
+    real_write = os.write
+    file_path = tmp_path / "out"
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT)
+    try:
+        with monkeypatch.context() as m:
+            m.setattr(sync.os, "write", lambda fd, data: real_write(fd, data[:7]))
+            assert _write_all(fd, BODY) == len(BODY)
+    finally:
+        os.close(fd)
+    assert file_path.read_bytes() == BODY
+
+
+def test_manifest_replays_log_over_snapshot(tmp_path):
+    worker = ArgoSyncWorker(stage_path=tmp_path)
+    worker._save_manifest({"downloaded": {"1"}, "failed": {"2"}})
+    worker._log_result("2", True)
+    worker._log_result("3", False)
+    with open(worker.manifest_log_path, "a") as f:
+        f.write('{"float_id": "4", "o')  # torn last line from a crash
+
+    assert worker._load_manifest() == {"downloaded": {"1", "2"}, "failed": {"3"}}
+
+    worker._save_manifest(worker._load_manifest())
+    assert not worker.manifest_log_path.exists()
+
+
+def test_adaptive_limiter_grows_and_backs_off():
+    async def run() -> None:
+        limiter = AdaptiveLimiter(initial=4, ceiling=10)
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.limit == 8
+        for _ in range(8):
+            limiter.on_success()
+        assert limiter.limit == 10
+
+        limiter.on_throttle()
+        assert limiter.limit == 5
+        # A burst of throttled responses within the cooldown cuts only once
+        limiter.on_throttle()
+        assert limiter.limit == 5
+
+    asyncio.run(run())
+
+
+def test_adaptive_limiter_caps_in_flight():
+    async def run() -> int:
+        limiter = AdaptiveLimiter(initial=2, ceiling=2)
+        in_flight = peak = 0
+
+        async def task() -> None:
+            nonlocal in_flight, peak
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*[task() for _ in range(6)])
+        return peak
+
+    assert asyncio.run(run()) == 2